@@ -1,46 +1,131 @@
+import os
+import uuid
+from contextlib import nullcontext
+from datetime import date
+from time import perf_counter, time
+
 import streamlit as st
 import pandas as pd
-import requests
 from pathlib import Path
 
+from wdtb.answers import AnswerIndex, CollegeSets
+from wdtb.daily import DailyGame, DailyResults, difficulties
+from wdtb.difficulty import DifficultyIndex, WeightedCursor
+from wdtb.headshots import HeadshotChecker, fallback_url, headshot_url, load_manifest
+from wdtb.index import PlayerIndex
+from wdtb.pool import PoolCursor, SeenSet
+from wdtb.profiler import RerunProfiler
+from wdtb.schema import to_app_frame
+from wdtb.scores import ScoreStore
+
 data_directory = Path(__file__).resolve().parent / "data" / "app_data"
 player_data = data_directory / "player_profile_data.csv"
-accepted_answers = pd.read_csv("data/manual/accepted_answers.csv")
-
-# accepted answer aliases
-# choosing to allow free form text answers rather than dropdown for now
-accepted_answers["aliases"] = accepted_answers.apply(
-    lambda row: [str(v).strip().lower() for v in [
-            row.get("college"),
-            row.get("display_name"),
-            row.get("variant_1"),
-            row.get("variant_2"),
-            row.get("variant_3"),
-            row.get("variant_4"),
-            row.get("variant_5"),
-            row.get("variant_6")
-        ]
-        if pd.notna(v)
-    ],
-    axis=1
-)
+player_artifact = data_directory / "player_profile_data.parquet"
+headshot_manifest = data_directory / "headshot_manifest.csv"
+accepted_answers = Path(__file__).resolve().parent / "data" / "manual" / "accepted_answers.csv"
+daily_directory = data_directory / "daily"
+score_store_path = Path(os.environ.get("WDTB_SCORES_PATH", data_directory / "scores.sqlite"))
 
-# lookup dictionary
-alias_lookup = {
-    row["collegeId"]: row["aliases"]
-    for _, row in accepted_answers.iterrows()
-}
+rerun_start = perf_counter()
 
-@st.cache_data
+@st.cache_resource
 def load_all_players():
-    df = pd.read_csv(player_data)
-    df["uuid"] = df["uuid"].astype(str)
-    return df
+    '''
+    Loads the typed parquet artifact built by preprocessing.py, falling back to the csv if it's missing.
+    This is the one shared player store for the process. Sessions only hold row ids into it, so never mutate it.
+    '''
+
+    if player_artifact.exists():
+        return pd.read_parquet(player_artifact)
+    return to_app_frame(pd.read_csv(player_data))
+
+
+@st.cache_resource
+def load_player_index():
+    '''
+    Filter index and sidebar facets, built once per process and shared by every session.
+    '''
+
+    return PlayerIndex(load_all_players())
+
+
+@st.cache_resource
+def load_answer_index():
+    '''
+    Accepted answer aliases, normalized and indexed once per process.
+    Choosing to allow free form text answers rather than dropdown for now, so typos within a small edit distance count.
+    '''
+
+    return AnswerIndex.from_csv(accepted_answers)
+
+
+@st.cache_resource
+def load_college_sets():
+    '''
+    Every college each player can be answered with (transfers, multi school overrides), aligned with the player store.
+    '''
+
+    return CollegeSets(load_all_players())
+
+
+@st.cache_resource(max_entries=2)
+def load_daily_game(day):
+    '''
+    The day's puzzles, built (or read from data/app_data/daily) once per process per day and shared by every session.
+    '''
+
+    return DailyGame.load(daily_directory, load_all_players(), load_player_index(), day)
+
+
+@st.cache_resource(max_entries=2)
+def load_daily_results(day):
+    # everyone's results for the day, seeded from the score store and kept up to date for the life of the process
+    results = DailyResults()
+    results.seed(load_score_store().daily_results(day.isoformat()))
+    return results
+
+
+@st.cache_resource
+def load_score_store():
+    '''
+    Persistent guesses, leaderboard and per-player accuracy. One store and one background writer per process.
+    '''
+
+    return ScoreStore(score_store_path)
+
+
+@st.cache_resource
+def load_difficulty_index():
+    '''
+    Per-player difficulty aligned with the player store, seeded from past guesses and refined as people play.
+    '''
+
+    index = DifficultyIndex(load_all_players())
+    index.seed(load_score_store().player_accuracy_table())
+    return index
+
+
+@st.cache_resource
+def load_profiler():
+    return RerunProfiler()
+
+
+def timed(phase):
+    '''
+    Times a phase of this rerun when profiling is on (?profile=1 or WDTB_PROFILE=1), otherwise does nothing.
+    '''
+
+    if profiling:
+        return load_profiler().phase(phase)
+    return nullcontext()
 
 
 def init_session(players):
-    if "players_pool" not in st.session_state:
-        st.session_state.players_pool = players.copy()
+    # players a session has already answered, as a bitset over row ids of the shared store
+    if "seen" not in st.session_state:
+        st.session_state.seen = SeenSet(len(players))
+    if "cursor" not in st.session_state:
+        st.session_state.cursor = None
     if "current" not in st.session_state:
         st.session_state.current = None
     if "correct" not in st.session_state:
@@ -53,6 +138,9 @@ def init_session(players):
         st.session_state.answered_current = False
     if "challenged_last" not in st.session_state:
         st.session_state.challenged_last = False
+    # daily game progress per date/league/difficulty: answers so far, next slot to answer and how many were right
+    if "daily_progress" not in st.session_state:
+        st.session_state.daily_progress = {}
 
 def challenge_last_answer():
     '''
@@ -63,18 +151,47 @@ def challenge_last_answer():
     st.session_state.correct += 1
     st.session_state.challenges += 1
     st.session_state.challenged_last = True
+    load_score_store().record_challenge(user_id, st.session_state.last_player_uuid)
+    load_difficulty_index().undo_miss(st.session_state.last_player_row)
 
 
-def pick_player(filtered):
+@st.cache_resource
+def load_headshot_manifest():
+    return load_manifest(headshot_manifest)
+
+
+@st.cache_resource
+def load_headshot_checker():
+    return HeadshotChecker()
+
+
+def player_image_url(player, wait=None):
+    '''
+    Headshot url for a player, or the league logo if ESPN has no headshot.
+    The prebuilt manifest answers most players for free, anyone missing from it gets a background check
+    memoized for the whole process. wait=0 only kicks the check off without blocking.
+    '''
+
+    player_id = str(int(player["id"]))
+    league = player["league"]
+    url = headshot_url(league, player_id)
+    available = load_headshot_manifest().get(player["uuid"])
+    if available is None:
+        checker = load_headshot_checker()
+        if wait == 0:
+            checker.check(url)
+            return url
+        available = checker.available(url, wait)
+    return url if available else fallback_url(league)
+
+
+def pick_player(cursor, seen):
     '''
     Picks a player at random to be presented to the user.
-    Returns None if no players match the filtered criteria.
+    Returns the player's row id, or None if every player matching the filters has been answered.
     '''
 
-    if filtered.empty:
-        return None 
-    sample_df = filtered.sample(n=1)
-    return sample_df.iloc[0]
+    return cursor.next_unseen(seen)
 
 
 
@@ -97,13 +214,32 @@ st.markdown(
 st.title("Where Did They Ball?")
 st.caption("Test your ball knowledge by guessing where athletes played in college. On mobile, click >> in the top left to filter.")
 
-players = load_all_players()
+# opt in rerun profiling, shown in the sidebar
+profiling = os.environ.get("WDTB_PROFILE") == "1" or st.query_params.get("profile") == "1"
+
+# scores are kept per user id, carried in the url so a reload keeps the same one
+if "u" not in st.query_params:
+    st.query_params["u"] = uuid.uuid4().hex[:12]
+user_id = st.query_params["u"]
+
+with timed("load"):
+    players = load_all_players()
+    player_index = load_player_index()
+    # built here rather than on first use in the guess and challenge callbacks, where a loading spinner
+    # would be drawn outside the card fragment
+    load_answer_index()
+    load_college_sets()
+    load_difficulty_index()
 
 
 # sidebar filters and controls
+sidebar_start = perf_counter()
 with st.sidebar:
     st.header("Setup")
 
+    mode = st.radio("Mode", options=["Free Play", "Daily Game"], index=0, horizontal=True)
+    daily_mode = mode == "Daily Game"
+
     sports = {"All": "all", "NFL": "nfl", "NBA": "nba", "MLB": "mlb", "NHL": "nhl"}
 
     sport_label = st.radio(
@@ -120,22 +256,12 @@ with st.sidebar:
     # put a placeholder here so we can fill it after
     pos_placeholder = st.empty()
 
-    # compute position options after knowing status_choice filter
-    filtered_players = players.copy()
-
     # print number of players in active status group in parenthesis after position
-    if sport_choice == "all":
-        pos_counts = filtered_players["position"].dropna().value_counts()
-    else:
-        pos_counts = (
-            filtered_players.loc[filtered_players["league"] == sport_choice, "position"]
-            .dropna()
-            .value_counts()
-        )
-
-    pos_labels = [f"{pos} ({count:,})" for pos, count in pos_counts.items()]
+    # counts and team lists come precomputed from the index rather than scanning players every rerun
+    pos_labels = [f"{pos} ({count:,})" for pos, count in player_index.position_counts.get(sport_choice, [])]
+    # the daily game is the same set of players for everyone, so the pool filters don't apply to it
     pos_choice = pos_placeholder.selectbox(
-        "Position", options=["All"] + pos_labels, index=0)
+        "Position", options=["All"] + pos_labels, index=0, disabled=daily_mode)
 
     # prefer All to be printed rather than blank
     if pos_choice == "All":
@@ -147,16 +273,7 @@ with st.sidebar:
     # team filter - should depend on sport and status
     team_placeholder = st.empty()
 
-    if sport_choice == "all":
-        teams = filtered_players["team"].dropna().unique()
-    else:
-        teams = (
-            filtered_players.loc[filtered_players["league"] == sport_choice, "team"]
-            .dropna()
-            .unique()
-        )
-
-    teams = sorted(teams)
+    teams = player_index.teams.get(sport_choice, [])
 
     # persist across other filtrations if valid
     if "team_choice" not in st.session_state:
@@ -172,28 +289,63 @@ with st.sidebar:
         options=["All"] + list(teams),
         index=(["All"] + list(teams)).index(st.session_state.team_choice),
         key="team_choice",
+        disabled=daily_mode,
     )
 
 
-    status_choice = st.radio("Player Status", options=["Active", "All Players"], index=0)
+    status_choice = st.radio("Player Status", options=["Active", "All Players"], index=0, disabled=daily_mode)
+
+    if daily_mode:
+        difficulty_choice = st.selectbox("Difficulty", options=difficulties, index=1)
+    else:
+        difficulty_choice = st.selectbox(
+            "Difficulty", options=["Any"] + difficulties, index=0,
+            help="Easy favours well known players, Hard favours deep cuts. Any picks uniformly.",
+        )
 
     st.markdown(
-    "> ⚠️ **Note:** Data comes from ESPN and may not include full transfer history. Usually only the most recent college is available.")
+    "> ⚠️ **Note:** Any college a player played at counts. Transfer history comes from ESPN and may be missing for some players, usually only the most recent college is available for them.")
 
 
     if st.button("Reset session / start over"):
         # reset session state with full player pool
-        st.session_state.players_pool = players.copy()
+        st.session_state.seen = SeenSet(len(players))
+        st.session_state.cursor = None
         st.session_state.current = None
         st.session_state.correct = 0
         st.session_state.total = 0
         st.session_state.last_result = None
         st.session_state.answered_current = False
 
+    # all-time free play scores, read from the precomputed leaderboard table
+    with st.expander("Leaderboard"):
+        score_store = load_score_store()
+        my_correct, my_total, my_challenges, my_name = score_store.user_score(user_id)
+        name = st.text_input("Leaderboard name", value=my_name or "", max_chars=24)
+        if name.strip() and name.strip() != (my_name or ""):
+            score_store.set_name(user_id, name.strip())
+        st.caption(f"Your all-time score: {my_correct:,} / {my_total:,}")
+        leaders = score_store.leaderboard()
+        if leaders:
+            st.dataframe(
+                pd.DataFrame(
+                    [(n or "anonymous", c, t, f"{c / t:.0%}") for _, n, c, t, _ in leaders],
+                    columns=["Name", "Correct", "Guesses", "Accuracy"],
+                ),
+                hide_index=True,
+            )
+        else:
+            st.caption("No one has 10 guesses yet.")
+
+
+if profiling:
+    load_profiler().record("sidebar", perf_counter() - sidebar_start)
 
 # if filter gets applied mid question, switch to that sport before answering, not after
 # gives the illusion that filter doesn't work if not
 filter_state = {
+    "mode": mode,
+    "difficulty": difficulty_choice,
     "sport": sport_choice,
     "position": pos_choice_clean,
     "active": status_choice,
@@ -214,168 +366,292 @@ else:
 init_session(players)
 
 # compute available pool according to sidebar filters
-pool = st.session_state.players_pool
-
-# filter by sport
-if sport_choice != "all":
-    pool = pool[pool["league"] == sport_choice]
+# the index gives the matching row ids and the session walks them in a shuffled order, skipping seen players
+# this only runs on full reruns (filters, mode, reset). guesses and challenges only rerun the card fragment below
+with timed("filter"):
+    if daily_mode:
+        # the daily puzzle is shared by every session, a session only keeps how far it got
+        daily_game = load_daily_game(date.today())
+        daily_key = f"{sport_choice}/{difficulty_choice}"
+        rows = daily_game.rows(sport_choice, difficulty_choice)
+        progress_key = f"{daily_game.date}/{daily_key}"
+        if progress_key not in st.session_state.daily_progress:
+            # a reload or a new tab picks up where the user left off, from the store or this process's results
+            stored = load_score_store().daily_progress(daily_game.date, user_id).get(daily_key, "")
+            answers = max(stored, load_daily_results(date.today()).answers(daily_key, user_id), key=len)
+            st.session_state.daily_progress[progress_key] = {
+                "answers": answers, "slot": len(answers), "correct": answers.count("1")}
+    else:
+        daily_key = progress_key = None
+        team_choice = st.session_state.get("team_choice", "All")
+        pool_key = (sport_choice, pos_choice_clean, team_choice, status_choice == "Active")
+        rows = player_index.rows(*pool_key)
+        if st.session_state.cursor is None or st.session_state.get("cursor_key") != (pool_key, difficulty_choice):
+            # a difficulty mode draws by weight from a shared per-pool sampler instead of walking the pool uniformly
+            cursor = PoolCursor(rows)
+            if difficulty_choice != "Any":
+                cursor = WeightedCursor(load_difficulty_index(), pool_key, rows, difficulty_choice, fallback=cursor)
+            st.session_state.cursor = cursor
+            st.session_state.cursor_key = (pool_key, difficulty_choice)
+
+# everything the card needs from the filters. the fragment keeps these arguments between full reruns
+pool = {
+    "daily": daily_mode,
+    "rows": rows,
+    "date": daily_game.date if daily_mode else None,
+    "daily_key": daily_key,
+    "progress_key": progress_key,
+    "sport_label": sport_label,
+    "difficulty": difficulty_choice,
+}
 
-# filter by position
-if pos_choice_clean:
-    pool = pool[pool["position"].fillna("").str.upper() == pos_choice_clean.strip().upper()]
 
-# apply team filter from session state
-team_choice = st.session_state.get("team_choice", "All")
-if team_choice != "All":
-    pool = pool[pool["team"].fillna("") == team_choice]
+# card state transitions. a card is either asking (current is set and not answered yet) or answered,
+# submit_guess and challenge_last_answer move it along and show_next_player moves it back to asking
+def show_next_player(pool):
+    '''
+    Picks the player to ask about when there's none selected or the previous one was answered.
+    '''
 
-# filter by active status
-if status_choice == "Active":
-    pool = pool[pool["active"] == True]
+    rows = pool["rows"]
+    if pool["daily"]:
+        # no sampling, the next player is just the next slot of today's puzzle
+        slot = st.session_state.daily_progress[pool["progress_key"]]["slot"]
+        st.session_state.current = int(rows[slot]) if slot < len(rows) else None
+        if st.session_state.answered_current:
+            st.session_state.answered_current = False
+            st.session_state.challenged_last = False
+            st.session_state.shown_at = time()
+    elif st.session_state.current is None or st.session_state.answered_current:
+        # None once every player matching the filters has been answered
+        with timed("pick"):
+            st.session_state.current = pick_player(st.session_state.cursor, st.session_state.seen)
+        st.session_state.answered_current = False
+        st.session_state.challenged_last = False
+        st.session_state.shown_at = time()
 
-# show remaining count
-st.write(f"Players matching current filters: **{len(pool):,}**")
 
+def submit_guess(pool):
+    '''
+    Grades the guess in the form, records it and marks the current player answered.
+    Runs as the submit button's callback, so the card's own rerun already shows the result and the next player.
+    '''
 
-# pick a player when there's none selected and we've moved past the previous answer
-if st.session_state.current is None or st.session_state.answered_current:
-    if pool.empty:
-        st.warning("No players match your filters.")
-        st.session_state.current = None
+    current = players.iloc[st.session_state.current]
+    guess = st.session_state.guess_input
+    daily_mode = pool["daily"]
+
+    # match the guess against the aliases of every college the player attended, forgiving small typos
+    also = load_college_sets().get(st.session_state.current)
+    correct, correct_display = load_answer_index().check(guess, current["collegeId"], also, current["college"])
+    st.session_state.last_result = ("correct" if correct else "incorrect", correct_display)
+    st.session_state.last_player_uuid = current["uuid"]
+    st.session_state.last_player_row = st.session_state.current
+
+    # queued for the background writer, this never waits on disk
+    latency_ms = (time() - st.session_state.get("shown_at", time())) * 1000
+    load_score_store().record_guess(
+        user_id, current["uuid"], guess, correct, latency_ms, mode="daily" if daily_mode else "free"
+    )
+    load_difficulty_index().observe(st.session_state.current, correct)
+
+    if daily_mode:
+        # daily answers count toward the day's shared results, not the free play score
+        # and are upserted per user, so replaying the puzzle after a reload can't count twice
+        progress = st.session_state.daily_progress[pool["progress_key"]]
+        progress["answers"] += "1" if correct else "0"
+        progress["slot"] += 1
+        progress["correct"] += int(correct)
+        finished = progress["slot"] == len(pool["rows"])
+        load_score_store().record_daily(pool["date"], pool["daily_key"], user_id, progress["answers"], finished)
+        load_daily_results(date.today()).record(pool["daily_key"], user_id, progress["answers"], finished)
     else:
-        st.session_state.current = pick_player(pool)
-        st.session_state.answered_current = False
-        st.session_state.challenged_last = False
+        st.session_state.total += 1
+        if correct:
+            st.session_state.correct += 1
 
-# main card
-# show current player stats
-if st.session_state.current is not None:
-    current = st.session_state.current
-    name = current["fullName"]
-    pos = current.get("position", "")
-    team = current.get("team", "")
-    league = current.get("league", "")
-    experience = current.get("experience_years", "")
-    experience = int(experience) if pd.notna(experience) else 0
-    draft_year = current.get("draftYear")
-    draft_year = int(float(draft_year)) if pd.notna(draft_year) else "Undrafted"    
-    draft_round = current.get("draftRound")
-    draft_round = int(draft_round) if pd.notna(draft_round) else "Undrafted"
-    playing_status = "Active" if str(current.get("active")).upper() == "TRUE" else "Inactive"
-        
-    # player headshots
-    if pd.notna(current.get("id")):
-        id = str(int(current["id"]))
-        
-        # construct endpoints
-        headshot_url = f"https://a.espncdn.com/combiner/i?img=/i/headshots/{league}/players/full/{id}.png&w=350&h=254"
-        fallback_url = f"https://a.espncdn.com/combiner/i?img=/i/teamlogos/leagues/500/{league}.png&w=350&h=254"
-
-        try:
-            response = requests.head(headshot_url, timeout=2)
-            if response.status_code != 200:
-                headshot_url = fallback_url
-        except:
-            headshot_url = fallback_url
-        
-        st.image(headshot_url, width=250, use_container_width=False)
-    else:
-        # maintain layout consistency
-        st.markdown('<div style="height: 182px;"></div>', unsafe_allow_html=True)
+        # drop current player so they won't be asked again during session
+        st.session_state.seen.add(st.session_state.current)
 
-    st.subheader(name)
+    # mark player as answered
+    st.session_state.answered_current = True
 
 
-    # no need to show draft round if they are undrafted
-    if draft_year != "Undrafted":
-        st.write(f"Position: {pos} | Team: {team} | Draft Year: {draft_year} | Draft Round: {draft_round} | Experience: {experience} | Status: {playing_status}")
-    else:
-        st.write(f"Position: {pos} | Team: {team} | Draft Year: {draft_year} | Experience: {experience} | Status: {playing_status}")
+@st.fragment
+def guess_card(pool):
+    '''
+    Pool count, player card, result banner, challenge flag, guess form and score.
+    Submitting a guess or a challenge reruns only this, the sidebar and pool above stay as they are.
+    '''
 
+    card_start = perf_counter()
+    daily_mode = pool["daily"]
+    rows = pool["rows"]
 
-    # show last result
-    if st.session_state.last_result:
-        result_type, correct_college = st.session_state.last_result
+    # show remaining count
+    if daily_mode:
+        progress = st.session_state.daily_progress[pool["progress_key"]]
+        st.write(f"Daily Game for {pool['date']}: player **{min(progress['slot'] + 1, len(rows))}** of **{len(rows)}**")
+    else:
+        remaining = len(rows) - st.session_state.seen.count_in(rows)
+        st.write(f"Players matching current filters: **{remaining:,}**")
 
-        # keep height stable and buttons aligned
-        cols = st.columns([3, 1])
+    # pick a player when there's none selected and we've moved past the previous answer
+    show_next_player(pool)
+    if not daily_mode and st.session_state.current is None:
+        st.warning("No players match your filters.")
 
-        # display answer to user
-        with cols[0]:
-            if result_type == "correct":
-                st.success(f"✓ Previous answer was correct! ({correct_college})")
-            else:
-                st.error(f"✗ Previous answer was incorrect. Correct answer: {correct_college}")
-
-        with cols[1]:
-            # challenge button should always visible so height remains consistent
-            # only active for incorrect answers not yet challenged
-            challenge_disabled = (
-                result_type != "incorrect" or 
-                st.session_state.get("challenged_last", False)
+    # main card
+    # show current player stats
+    if st.session_state.current is not None:
+        render_start = perf_counter()
+        current = players.iloc[st.session_state.current]
+        name = current["fullName"]
+        pos = current.get("position", "")
+        team = current.get("team", "")
+        league = current.get("league", "")
+        experience = current.get("experience_years", "")
+        experience = int(experience) if pd.notna(experience) else 0
+        draft_year = current.get("draftYear")
+        draft_year = int(float(draft_year)) if pd.notna(draft_year) else "Undrafted"    
+        draft_round = current.get("draftRound")
+        draft_round = int(draft_round) if pd.notna(draft_round) else "Undrafted"
+        playing_status = "Active" if str(current.get("active")).upper() == "TRUE" else "Inactive"
+
+        # player headshots
+        if pd.notna(current.get("id")):
+            with timed("headshot"):
+                image_url = player_image_url(current)
+            st.image(image_url, width=250)
+        else:
+            # maintain layout consistency
+            st.markdown('<div style="height: 182px;"></div>', unsafe_allow_html=True)
+
+        st.subheader(name)
+
+
+        # no need to show draft round if they are undrafted
+        if draft_year != "Undrafted":
+            st.write(f"Position: {pos} | Team: {team} | Draft Year: {draft_year} | Draft Round: {draft_round} | Experience: {experience} | Status: {playing_status}")
+        else:
+            st.write(f"Position: {pos} | Team: {team} | Draft Year: {draft_year} | Experience: {experience} | Status: {playing_status}")
+
+        # career stat hints are stored as finished text, nothing is aggregated here
+        stat_hints = current.get("statHints")
+        if pd.notna(stat_hints):
+            for line in stat_hints.split("\n"):
+                st.caption(line)
+
+
+        # show last result
+        if st.session_state.last_result:
+            result_type, correct_college = st.session_state.last_result
+
+            # keep height stable and buttons aligned
+            cols = st.columns([3, 1])
+
+            # display answer to user
+            with cols[0]:
+                if result_type == "correct":
+                    st.success(f"✓ Previous answer was correct! ({correct_college})")
+                else:
+                    st.error(f"✗ Previous answer was incorrect. Correct answer: {correct_college}")
+                guesses, right = load_score_store().player_accuracy(st.session_state.get("last_player_uuid"))
+                if guesses:
+                    st.caption(f"{right / guesses:.0%} of {guesses:,} guesses on that player were right")
+
+            with cols[1]:
+                # challenge button should always visible so height remains consistent
+                # only active for incorrect answers not yet challenged
+                # the daily game has a shared leaderboard, so no challenges there
+                challenge_disabled = (
+                    result_type != "incorrect" or 
+                    st.session_state.get("challenged_last", False) or
+                    daily_mode
+                )
+
+                st.button(
+                    "🚩 Challenge Flag",
+                    key="challenge_button",
+                    disabled=challenge_disabled,
+                    help="Adds 1 to your score if you believe your last answer was correct or a typo. Not available in the Daily Game.",
+                    on_click=challenge_last_answer
+                )
+
+        if "challenges" not in st.session_state:
+            st.session_state.challenges = 0
+
+        # guess form
+        with st.form("guess_form", clear_on_submit=True):
+            st.text_input(
+                "Where did this player go to college?",
+                placeholder="Type college name (ie. 'Notre Dame')",
+                key="guess_input"
             )
 
-            st.button(
-                "🚩 Challenge Flag",
-                key="challenge_button",
-                disabled=challenge_disabled,
-                help="Adds 1 to your score if you believe your last answer was correct or a typo.",
-                on_click=challenge_last_answer
+            st.form_submit_button("Submit guess", width="stretch", on_click=submit_guess, args=(pool,))
+
+        # score display section
+        if daily_mode:
+            st.markdown(f"**Daily score:** {progress['correct']} / {progress['slot']}")
+        elif st.session_state.total > 0:
+            accuracy = (st.session_state.correct / st.session_state.total * 100)
+            st.markdown(
+                f"**Score:** {st.session_state.correct} / {st.session_state.total}  —  {accuracy:.1f}%"
+                + (f"  _({st.session_state.challenges} challenge{'s' if st.session_state.challenges != 1 else ''})_" 
+                if st.session_state.challenges > 0 else "")
             )
+        else:
+            st.markdown(f"**Score:** 0 / 0  —  0.0%")
+
+        # warm up the next player's headshot while this one is being answered
+        # the HEAD check runs in the background and the hidden img gets the browser to fetch the image early
+        if daily_mode:
+            next_row = int(rows[progress["slot"] + 1]) if progress["slot"] + 1 < len(rows) else None
+        else:
+            next_row = st.session_state.cursor.peek_unseen(st.session_state.seen)
+        if next_row is not None and next_row != st.session_state.current:
+            next_player = players.iloc[next_row]
+            if pd.notna(next_player["id"]):
+                next_url = player_image_url(next_player, wait=0)
+                st.markdown(f'<img src="{next_url}" style="display:none" alt="">', unsafe_allow_html=True)
+
+        if profiling:
+            load_profiler().record("render", perf_counter() - render_start)
+
+    elif daily_mode and len(rows):
+        # finished today's puzzle, show how it went next to everyone else
+        summary = load_daily_results(date.today()).summary(pool["daily_key"])
+        if st.session_state.last_result:
+            result_type, correct_college = st.session_state.last_result
+            if result_type == "correct":
+                st.success(f"✓ Last answer was correct! ({correct_college})")
+            else:
+                st.error(f"✗ Last answer was incorrect. Correct answer: {correct_college}")
+        st.subheader(f"Daily Game complete: {progress['correct']} / {len(rows)}")
+        if summary["finished"]:
+            finishers = "player" if summary["finished"] == 1 else "players"
+            st.write(f"{summary['finished']:,} {finishers} finished today's {pool['sport_label']} {pool['difficulty']} puzzle, "
+                     f"averaging {summary['average']:.1f} / {len(rows)}.")
+        solved = [f"{i + 1}: {rate:.0%}" for i, rate in enumerate(summary["solved"][:len(rows)]) if rate is not None]
+        if solved:
+            st.caption("Answered correctly by player: " + " | ".join(solved))
+        st.info("Come back tomorrow for a new puzzle, or switch league or difficulty in the sidebar.")
 
-    if "challenges" not in st.session_state:
-        st.session_state.challenges = 0
-
-    # guess form
-    with st.form("guess_form", clear_on_submit=True):
-        guess = st.text_input(
-            "Where did this player go to college?",
-            placeholder="Type college name (ie. 'Notre Dame')",
-            key="guess_input"
-        )
-
-        submitted = st.form_submit_button("Submit guess", use_container_width=True)
+    else:
+        st.info("No player selected. Adjust filters or reset the session.")
 
-        if submitted:
-            true_college = str(current["college"]).strip()
-            guess_norm = guess.strip().lower()
-            college_id = current.get("collegeId")
+    if profiling:
+        load_profiler().record("card", perf_counter() - card_start)
 
-            st.session_state.total += 1
 
-            # get list of accepted aliases for this college
-            accepted = alias_lookup.get(college_id, [])
-            correct = guess_norm in accepted
+guess_card(pool)
 
-            if correct:
-                st.session_state.correct += 1
-                st.session_state.last_result = ("correct", accepted_answers.loc[accepted_answers["collegeId"] == college_id, "display_name"].values[0])
-            else:
-                correct_display = accepted_answers.loc[accepted_answers["collegeId"] == college_id, "display_name"].values[0]
-                st.session_state.last_result = ("incorrect", correct_display)
-
-            # drop current player so they won't be asked again during session
-            pid = st.session_state.current["uuid"]
-            st.session_state.players_pool = st.session_state.players_pool[
-                st.session_state.players_pool["uuid"] != pid
-            ]
-
-            # mark player as answered
-            st.session_state.answered_current = True
-            
-            # re-run to show next player
-            st.rerun()
-
-    # score display section
-    if st.session_state.total > 0:
-        accuracy = (st.session_state.correct / st.session_state.total * 100)
-        st.markdown(
-            f"**Score:** {st.session_state.correct} / {st.session_state.total}  —  {accuracy:.1f}%"
-            + (f"  _({st.session_state.challenges} challenge{'s' if st.session_state.challenges != 1 else ''})_" 
-            if st.session_state.challenges > 0 else "")
-        )
-    else:
-        st.markdown(f"**Score:** 0 / 0  —  0.0%")
 
-else:
-    st.info("No player selected. Adjust filters or reset the session.")
\ No newline at end of file
+# rolling p50/p95 per phase across every session in this process
+if profiling:
+    profiler = load_profiler()
+    profiler.record("rerun", perf_counter() - rerun_start)
+    with st.sidebar.expander("Rerun profile", expanded=True):
+        st.dataframe(profiler.table(), width="stretch")
+        st.download_button("Download JSON", profiler.to_json(), file_name="rerun_profile.json", mime="application/json")
\ No newline at end of file
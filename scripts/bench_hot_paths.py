@@ -0,0 +1,377 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+script_directory = Path(__file__).resolve().parent
+sys.path.insert(0, str(script_directory.parent))
+
+from wdtb.answers import AnswerIndex, CollegeSets
+from wdtb.difficulty import DifficultyIndex, WeightedCursor
+from wdtb.index import PlayerIndex
+from wdtb.pool import PoolCursor, SeenSet
+from wdtb.schema import to_app_frame
+import preprocessing
+
+# times the app's and preprocessing's hot paths one at a time on synthetic player tables,
+# records wall time and peak memory per path and compares them against a stored baseline.
+# times are also kept relative to a fixed calibration workload run in the same process. baselines are stored per
+# host and a machine is gated against its own at --threshold. a machine without one is gated against every stored
+# host's calibrated times at the looser --cross-host-threshold, so a big regression fails the run anywhere
+#   python bench_hot_paths.py                          # 16k, 100k and 1M rows, compared to the baseline
+#   python bench_hot_paths.py --sizes 16000 --save-baseline
+
+baseline_path = script_directory / "bench_hot_paths_baseline.json"
+accepted_answers_path = preprocessing.shared_inputs["accepted_answers"]
+
+# roughly the current mix of the real data
+league_shares = {"nfl": 0.87, "mlb": 0.08, "nba": 0.03, "nhl": 0.02}
+league_positions = {
+    "nfl": ["LB", "WR", "RB", "CB", "DE", "DT", "TE", "OT", "DB", "S", "QB", "G", "C", "OG", "PK", "P", "FB", "LS"],
+    "nba": ["G", "F", "C", "SG", "PF", "PG", "SF"],
+    "mlb": ["RP", "SP", "C", "1B", "3B", "2B", "LF", "RF", "CF", "SS", "DH", "OF"],
+    "nhl": ["D", "C", "LW", "RW", "G"],
+}
+first_names = ["James", "Michael", "Chris", "David", "Marcus", "Tyler", "Jalen", "Kevin", "Brandon", "Anthony",
+               "Derek", "Luis", "Connor", "Zach", "Andre", "Malik", "Ryan", "Jordan", "Trey", "Darius"]
+last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia", "Wilson", "Moore",
+              "Taylor", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Robinson", "Lewis", "Walker"]
+
+
+def synthetic_profiles(n, accepted_answers, seed=0):
+    '''
+    n player profiles with the player_profile_data.csv columns. Colleges come from the accepted answers
+    so every player can be graded, the other columns are drawn to roughly match the real distributions.
+    '''
+
+    rng = np.random.default_rng(seed)
+    league = rng.choice(list(league_shares), size=n, p=list(league_shares.values()))
+    ids = np.arange(1, n + 1)
+    position = np.empty(n, dtype=object)
+    team = np.empty(n, dtype=object)
+    for name, positions in league_positions.items():
+        rows = np.flatnonzero(league == name)
+        position[rows] = rng.choice(positions, size=len(rows))
+        team[rows] = [f"{name.upper()}{t:02d}" for t in rng.integers(0, 32, size=len(rows))]
+    colleges = accepted_answers.iloc[rng.integers(0, len(accepted_answers), size=n)]
+    experience = np.minimum(rng.geometric(0.2, size=n), 29).astype(float)
+    debut = rng.integers(1960, 2025, size=n).astype(float)
+    drafted = rng.random(n) < 0.46
+    draft_round = np.where(drafted, rng.integers(1, 8, size=n), np.nan)
+
+    profiles = pd.DataFrame({
+        "uuid": [f"{i}_{l}" for i, l in zip(ids, league)],
+        "id": ids,
+        "league": league,
+        "fullName": [f"{first_names[a]} {last_names[b]}" for a, b in rng.integers(0, 20, size=(n, 2))],
+        "position": position,
+        "team": team,
+        "active": rng.random(n) < 0.15,
+        "experience_years": experience,
+        "debutYear": debut,
+        "college": colleges["college"].to_numpy(),
+        "collegeId": colleges["collegeId"].to_numpy(dtype=float),
+        "college_source": "collegeAthlete",
+        "draftYear": np.where(drafted, debut, np.nan),
+        "draftRound": draft_round,
+        "draftPick": np.where(drafted, draft_round * 32 - rng.integers(0, 32, size=n), np.nan),
+        "processed_ts": "2025-10-11T16:21:53.132055",
+    })
+
+    # about a quarter of players transferred in from another college two seasons before they left.
+    # drawn from their own generator so the columns above stay the same as before histories existed
+    rng = np.random.default_rng(seed + 1)
+    college_ids = profiles["collegeId"].to_numpy(dtype=np.int64)
+    transferred = rng.random(n) < 0.25
+    previous = accepted_answers["collegeId"].to_numpy(dtype=np.int64)[rng.integers(0, len(accepted_answers), size=n)]
+    last = debut.astype(np.int64) - 1
+    profiles.insert(profiles.columns.get_loc("college_source") + 1, "college_history", [
+        f"{p}:{y - 3}-{y - 2};{c}:{y - 1}-{y}" if t else f"{c}:{y - 3}-{y}"
+        for c, p, y, t in zip(college_ids, previous, last, transferred)
+    ])
+    profiles["collegeIds"] = [f"{c};{p}" if t else str(c) for c, p, t in zip(college_ids, previous, transferred)]
+    return profiles
+
+
+def scd_history(profiles, seed=0):
+    '''
+    The profiles as SCD scraper output: every player current (is_latest 1) plus a fifth of them with an
+    older version, and a few rows preprocessing filters out (no position, no experience, no college).
+    '''
+
+    rng = np.random.default_rng(seed)
+    history = profiles.sample(frac=0.2, random_state=seed).assign(is_latest=0)
+    current = profiles.assign(is_latest=1)
+    dropped = rng.random(len(current))
+    current.loc[dropped < 0.01, "position"] = "-"
+    current.loc[(dropped >= 0.01) & (dropped < 0.02), "experience_years"] = np.nan
+    current.loc[(dropped >= 0.02) & (dropped < 0.03), ["college", "collegeId"]] = np.nan
+    return pd.concat([current, history], ignore_index=True)
+
+
+def typo(text, rng):
+    # swaps two neighbouring letters, the most common mistake in the guess box
+    if len(text) < 4:
+        return text
+    i = rng.randrange(len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def prepare(size, workdir, accepted_answers, seed=0):
+    '''
+    Everything the benchmarks read: the synthetic table, its artifacts on disk and the objects the app builds from it.
+    '''
+
+    profiles = synthetic_profiles(size, accepted_answers, seed)
+    csv_path = workdir / f"players_{size}.csv"
+    parquet_path = workdir / f"players_{size}.parquet"
+    profiles.to_csv(csv_path, index=False)
+    players = to_app_frame(profiles)
+    players.to_parquet(parquet_path, index=False)
+
+    league_paths = {}
+    history = scd_history(profiles, seed)
+    for league, group in history.groupby("league"):
+        league_paths[league] = workdir / f"{league}_{size}.csv"
+        group.to_csv(league_paths[league], index=False)
+
+    rng = random.Random(seed)
+    sample = profiles.sample(n=500, random_state=seed)
+    guesses = list(zip(sample["college"], sample.index))
+    guesses += [(typo(c, rng), row) for c, row in guesses[:250]]
+    guesses += [("not a real school", row) for _, row in guesses[:50]]
+
+    index = PlayerIndex(players)
+    filters = [("all", "", "All", False)]
+    for league, positions in league_positions.items():
+        filters += [(league, "", "All", False), (league, "", "All", True), (league, positions[0], "All", False),
+                    (league, positions[0], f"{league.upper()}07", True)]
+
+    return {
+        "profiles": profiles, "players": players, "index": index, "filters": filters,
+        "csv_path": csv_path, "parquet_path": parquet_path, "league_paths": league_paths,
+        "answers": AnswerIndex(accepted_answers), "accepted_answers": accepted_answers, "guesses": guesses,
+        "difficulty": DifficultyIndex(players), "college_sets": CollegeSets(players),
+    }
+
+
+def pick_players(data, pool_key, picks=1000, weighted=False):
+    rows = data["index"]._rows(*pool_key)
+    seen = SeenSet(len(data["players"]))
+    cursor = PoolCursor(rows, seed=1)
+    if weighted:
+        cursor = WeightedCursor(data["difficulty"], pool_key, rows, "Hard", cursor, seed=1)
+    for _ in range(min(picks, len(rows))):
+        seen.add(cursor.next_unseen(seen))
+
+
+def shrink_pool(data, answers=1000):
+    # what the app does after each answer: mark the player seen, then count what's left of the pool
+    rows = data["index"]._rows("nfl")
+    seen = SeenSet(len(data["players"]))
+    for row in rows[:answers]:
+        seen.add(int(row))
+        len(rows) - seen.count_in(rows)
+
+
+def check_answers(data):
+    # the same lookup as the guess form: the shown college plus every other college the player attended
+    answers, college_sets, college_ids = data["answers"], data["college_sets"], data["players"]["collegeId"]
+    for guess, row in data["guesses"]:
+        answers.check(guess, college_ids.iat[row], college_sets.get(row))
+
+
+def preprocess(data):
+    # preprocessing's scan filter, the concat of the league frames, the college filter and the app cast
+    frames = [preprocessing.read_league(path) for path in data["league_paths"].values()]
+    to_app_frame(preprocessing.drop_missing_college(pd.concat(frames, ignore_index=True)))
+
+
+benchmarks = {
+    "load_players_parquet": lambda d: pd.read_parquet(d["parquet_path"]),
+    "load_players_csv": lambda d: to_app_frame(pd.read_csv(d["csv_path"])),
+    "index_and_facets": lambda d: PlayerIndex(d["players"]),
+    "pool_filter": lambda d: [d["index"]._rows(*f) for f in d["filters"]],
+    "pick_player": lambda d: pick_players(d, ("all", "", "All", False)),
+    "pick_player_filtered": lambda d: pick_players(d, ("nfl", "", "All", True)),
+    "pick_player_weighted": lambda d: pick_players(d, ("nfl", "", "All", False), weighted=True),
+    "answer_index_build": lambda d: AnswerIndex(d["accepted_answers"]),
+    "college_sets_build": lambda d: CollegeSets(d["players"]),
+    "answer_check": check_answers,
+    "pool_shrink": shrink_pool,
+    "preprocess_concat_filter": preprocess,
+}
+
+
+def timed(fn, *args):
+    start = perf_counter()
+    fn(*args)
+    return perf_counter() - start
+
+
+def measure(fn, data, repeat):
+    '''
+    Best wall time of repeat runs, the one least disturbed by anything else on the machine, and the time relative
+    to the calibration workload. Every run is paired with a calibration run right before it and the median of the
+    pairs' ratios is kept, so the machine getting faster or slower while the suite runs cancels out.
+    Then the peak traced allocation of one more run.
+    Peak memory covers numpy and pandas allocations, arrow's own buffers aren't traced.
+    '''
+
+    fn(data)
+    times, ratios = [], []
+    for _ in range(repeat):
+        calibration = timed(calibration_workload)
+        times.append(timed(fn, data))
+        ratios.append(times[-1] / calibration)
+    tracemalloc.start()
+    fn(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": min(times), "relative": float(np.median(ratios)), "peak_mb": peak / 2 ** 20}
+
+
+def host_id():
+    # what the timings depend on: cpu model, core count and architecture. hostnames change with every container
+    model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            model = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), model)
+    except OSError:
+        pass
+    return f"{model or 'unknown cpu'} x{os.cpu_count()} {platform.machine()}"
+
+
+def calibration_workload():
+    # a fixed mix of what the benchmarks spend their time on: numpy sorting, a pandas groupby and python dicts
+    rng = np.random.default_rng(0)
+    np.sort(rng.random(1_000_000))
+    frame = pd.DataFrame({"key": rng.integers(0, 1000, 200_000), "value": rng.random(200_000)})
+    frame.groupby("key")["value"].sum()
+    counts = {}
+    for i in range(200_000):
+        counts[i % 977] = counts.get(i % 977, 0) + 1
+
+
+def calibrate(repeat=7):
+    # best time of the calibration workload, reported with the results to show how fast the machine was
+    calibration_workload()
+    return min(timed(calibration_workload) for _ in range(repeat))
+
+
+def reference_baseline(baselines):
+    # the median calibrated time and memory per benchmark across every stored host, for hosts without their own
+    merged = {}
+    for entry in baselines.values():
+        for size, benches in entry["sizes"].items():
+            for name, r in benches.items():
+                merged.setdefault(size, {}).setdefault(name, []).append(r)
+    return {
+        size: {name: {metric: float(np.median([r[metric] for r in runs])) for metric in ["relative", "peak_mb"]}
+               for name, runs in benches.items()}
+        for size, benches in merged.items()
+    }
+
+
+def compare(results, baseline, time_threshold, memory_threshold, min_seconds=0.002, min_mb=1.0):
+    '''
+    (size, benchmark, metric, baseline, current) for everything more than its threshold worse than the baseline.
+    Time is compared relative to each run's calibration, so a busier or slower moment of the same host
+    doesn't show up as a regression. Differences under min_seconds or min_mb are noise and never count.
+    '''
+
+    regressions = []
+    for size, benches in results.items():
+        for name, current in benches.items():
+            base = baseline.get(size, {}).get(name)
+            if not base:
+                continue
+            for metric, threshold, floor in [("relative", time_threshold, min_seconds * current["relative"] / current["seconds"]),
+                                             ("peak_mb", memory_threshold, min_mb)]:
+                if current[metric] > base[metric] * (1 + threshold) and current[metric] - base[metric] > floor:
+                    regressions.append((size, name, metric, base[metric], current[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app and preprocessing hot paths on synthetic data")
+    parser.add_argument("--sizes", default="16000,100000,1000000", help="comma separated player counts")
+    parser.add_argument("--only", help="comma separated benchmark names, default all")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown or memory growth, 0.25 = 25%%")
+    parser.add_argument("--cross-host-threshold", type=float, default=1.0,
+                        help="allowed calibrated slowdown on a host without its own baseline, 1.0 = twice as slow")
+    parser.add_argument("--baseline", type=Path, default=baseline_path)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--output", type=Path, help="also write the results as json here")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(benchmarks)
+    accepted_answers = pd.read_csv(accepted_answers_path, encoding="utf-8-sig")
+    host = host_id()
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline, threshold = None, args.threshold
+    if not args.save_baseline:
+        if not baselines:
+            raise SystemExit(f"No baseline at {args.baseline}, run with --save-baseline first")
+        if host in baselines:
+            baseline = baselines[host]["sizes"]
+        else:
+            # calibrated times still differ a bit between cpus, hence the looser threshold. memory doesn't
+            baseline, threshold = reference_baseline(baselines), args.cross_host_threshold
+            print(f"WARNING: no baseline for {host}, comparing calibrated times against {len(baselines)} other "
+                  f"host(s) at {threshold:.0%}. Run with --save-baseline on this machine for the {args.threshold:.0%} gate")
+
+    calibration = calibrate()
+    print(f"{host}, calibration {calibration * 1000:.1f} ms")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes.split(","):
+            print(f"Generating {int(size):,} players")
+            data = prepare(int(size), Path(tmp), accepted_answers)
+            results[size] = {}
+            for name in names:
+                r = results[size][name] = measure(benchmarks[name], data, args.repeat)
+                print(f"  {name:<26} {r['seconds'] * 1000:>10.2f} ms {r['peak_mb']:>9.1f} MB")
+
+            # a path over the threshold is measured once more while its data is still here, and keeps its best
+            # time. a busy neighbour rarely slows the same path twice, a real regression shows up both times
+            if baseline is not None:
+                for _, name, metric, _, _ in compare({size: results[size]}, baseline, threshold, args.threshold):
+                    if metric == "relative":
+                        r, again = results[size][name], measure(benchmarks[name], data, args.repeat)
+                        r["seconds"], r["relative"] = min(r["seconds"], again["seconds"]), min(r["relative"], again["relative"])
+                        print(f"  {name:<26} {r['seconds'] * 1000:>10.2f} ms  (measured again)")
+            del data
+
+    if args.output:
+        args.output.write_text(json.dumps({"host": host, "calibration_seconds": calibration, "sizes": results}, indent=2))
+    if args.save_baseline:
+        entry = baselines.setdefault(host, {"sizes": {}})
+        entry["calibration_seconds"] = calibration
+        for size, benches in results.items():
+            entry["sizes"].setdefault(size, {}).update(benches)
+        args.baseline.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"Saved baseline for {host} to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, threshold, args.threshold)
+    for size, name, metric, base, current in regressions:
+        label = "time vs calibration" if metric == "relative" else metric
+        print(f"REGRESSION {name} at {int(size):,} players: {label} {base:.4g} -> {current:.4g} ({current / base - 1:+.0%})")
+    if regressions:
+        raise SystemExit(f"{len(regressions)} benchmark(s) regressed beyond the threshold")
+    print(f"No regressions beyond {threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
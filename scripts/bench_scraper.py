@@ -0,0 +1,111 @@
+import argparse
+import tempfile
+from pathlib import Path
+from time import time
+
+import pandas as pd
+
+from espn_client import EspnClient
+from http_cache import ResponseCache
+from mock_espn_server import MockEspn, serve
+import get_espn_api_player_profiles as scraper
+
+# compares the sequential scrape (concurrency 1) against the concurrent engine on a local stand-in server
+# rows must come out identical, only the speed should change
+# with --sizes it instead runs whole league scrapes (list, detail chain, staging, merge) at scale
+
+
+def run(mock, sport, league, concurrency, athletes, cache=None):
+    client = EspnClient(concurrency=concurrency, cache=cache, base=mock.base)
+    athlete_url = f"{mock.base}/v2/sports/{sport}/leagues/{league}/athletes/{{}}"
+    mock.calls.clear()
+    start = time()
+    rows = scraper.scrape_athletes(client, athletes, league, athlete_url, "bench")
+    elapsed = time() - start
+    return rows, elapsed, sum(mock.calls.values())
+
+
+def run_scale(args, size):
+    '''
+    One full scrape_league of size synthetic athletes into a throwaway directory.
+    '''
+
+    mock = MockEspn(
+        n_athletes=size, latency=args.latency, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, fixtures=args.fixtures,
+    )
+    server = serve(mock)
+    client = EspnClient(concurrency=args.concurrency, base=mock.base)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time()
+        scraper.scrape_league(client, "nfl", Path(tmp), "bench")
+        elapsed = time() - start
+        scraped = len(pd.read_csv(Path(tmp) / "nfl_espn_api_player_profiles.csv", usecols=["uuid"]))
+    server.shutdown()
+    calls = sum(mock.calls.values())
+    return {
+        "athletes": scraped,
+        "seconds": elapsed,
+        "athletes_per_sec": scraped / elapsed,
+        "calls_per_athlete": calls / max(scraped, 1),
+        "injected": mock.calls["throttled"] + mock.calls["error"],
+        "retries": client.stats.retries,
+        "failed": client.stats.failed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the profile scraper against a local stand-in server")
+    parser.add_argument("--athletes", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every mock response")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sizes", help="comma separated athlete counts for full league scrapes, ie. 10000,50000,100000")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of mock requests answered with a 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of mock requests answered with a 429")
+    parser.add_argument("--fixtures", type=Path, help="recorded documents for the mock, see record_espn_fixtures.py")
+    args = parser.parse_args()
+
+    if args.sizes:
+        results = [run_scale(args, int(size)) for size in args.sizes.split(",")]
+        print(f"\n{'athletes':>9} {'seconds':>8} {'athletes/s':>10} {'calls/athlete':>13} {'injected':>8} {'retries':>7} {'failed':>6}")
+        for r in results:
+            print(f"{r['athletes']:>9} {r['seconds']:>8.1f} {r['athletes_per_sec']:>10.1f} {r['calls_per_athlete']:>13.2f} "
+                  f"{r['injected']:>8} {r['retries']:>7} {r['failed']:>6}")
+        return
+
+    sport, league = "football", "nfl"
+    mock = MockEspn(
+        n_athletes=args.athletes, latency=args.latency, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, fixtures=args.fixtures,
+    )
+    server = serve(mock)
+
+    client = EspnClient(concurrency=args.concurrency, base=mock.base)
+    athletes = scraper.fetch_athlete_list(client, f"{mock.base}/v3/sports/{sport}/{league}/athletes?limit=18000")
+
+    results = {}
+    for concurrency in (1, args.concurrency):
+        rows, elapsed, calls = run(mock, sport, league, concurrency, athletes)
+        results[concurrency] = rows
+        print(f"concurrency={concurrency:>3}: {len(rows)} athletes in {elapsed:.2f}s "
+              f"- {len(rows) / elapsed:.1f} athletes/sec - {calls / len(rows):.2f} calls/athlete")
+
+    same = results[1] == results[args.concurrency]
+    print(f"Rows identical: {same}")
+
+    # a rerun against a warm persistent cache should only be paying for athlete documents
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp) / "cache.sqlite", ttls={"college": 3600, "position": 3600, "team": 3600})
+        for label in ("cold cache", "warm cache"):
+            rows, elapsed, calls = run(mock, sport, league, args.concurrency, athletes, cache=cache)
+            print(f"{label}: {elapsed:.2f}s - {calls / len(rows):.2f} calls/athlete - {dict(mock.calls)}")
+        for line in cache.summary():
+            print(line)
+        cache.close()
+    server.shutdown()
+    if not same:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+script_directory = Path(__file__).resolve().parent
+sys.path.insert(0, str(script_directory.parent))
+
+from wdtb import headshots
+
+app_directory = script_directory.parent / "data" / "app_data"
+player_artifact = app_directory / "player_profile_data.parquet"
+player_data = app_directory / "player_profile_data.csv"
+manifest_path = app_directory / "headshot_manifest.csv"
+
+local = threading.local()
+
+
+def check(player):
+    # one session per worker thread so connections get reused
+    session = getattr(local, "session", None)
+    if session is None:
+        session = local.session = requests.Session()
+    uuid, league, player_id = player
+    return uuid, headshots.head_ok(headshots.headshot_url(league, player_id), timeout=5, session=session)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record which players have an ESPN headshot so the app doesn't have to check")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--cdn-base", default=headshots.cdn_base, help="image host, ie. a local stand-in server")
+    parser.add_argument("--output", type=Path, default=manifest_path)
+    parser.add_argument("--refresh", action="store_true", help="recheck players already in the manifest")
+    args = parser.parse_args()
+
+    headshots.cdn_base = args.cdn_base.rstrip("/")
+
+    if player_artifact.exists():
+        players = pd.read_parquet(player_artifact, columns=["uuid", "id", "league"])
+    else:
+        players = pd.read_csv(player_data, usecols=["uuid", "id", "league"])
+    players = players[players["id"].notna()]
+
+    # only players we haven't checked before, unless asked to redo everything
+    existing = pd.DataFrame(columns=["uuid", "has_headshot", "checked_ts"])
+    if args.output.exists() and not args.refresh:
+        existing = pd.read_csv(args.output, dtype={"uuid": str})
+        players = players[~players["uuid"].astype(str).isin(existing["uuid"])]
+
+    todo = [(str(u), str(l), str(int(i))) for u, l, i in players[["uuid", "league", "id"]].itertuples(index=False)]
+    print(f"Checking {len(todo)} headshots ({len(existing)} already in manifest)")
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(check, todo))
+
+    checked = pd.DataFrame(results, columns=["uuid", "has_headshot"])
+    checked["checked_ts"] = datetime.now().isoformat()
+    manifest = pd.concat([existing, checked], ignore_index=True).drop_duplicates("uuid", keep="last")
+    manifest = manifest.sort_values("uuid")
+
+    # write to a temp file first so the app never reads a half written manifest
+    tmp_path = args.output.with_name(args.output.name + ".tmp")
+    manifest.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, args.output)
+    print(f"Manifest has {len(manifest)} players, {int(manifest['has_headshot'].sum())} with headshots")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import os
+import threading
+from concurrent.futures import Future
+from time import perf_counter, sleep
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_control import AdaptiveRate, FetchStats, backoff
+
+headers = {"User-Agent": "college-script/1.0"}
+
+# responses that mean "slow down / try again", as opposed to a 404 which means the document doesn't exist
+retry_statuses = {429, 500, 502, 503, 504}
+
+# point at a local stand-in server for benchmarking, ie. ESPN_API_BASE=http://127.0.0.1:8765
+base_url = os.environ.get("ESPN_API_BASE", "https://sports.core.api.espn.com").rstrip("/")
+
+
+class FetchError(Exception):
+    '''
+    A request that still failed after every retry. Unlike a 404 this says nothing about whether the data exists.
+    '''
+
+    def __init__(self, url, kind):
+        super().__init__(f"{kind} fetching {url}")
+        self.url = url
+        self.kind = kind
+
+
+def retry_after_seconds(response):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class EspnClient:
+    '''
+    Thread-safe wrapper around the ESPN core API.
+    concurrency caps the number of requests in flight at once across every thread using the client.
+    $ref documents (colleges, teams, positions) are cached and in-flight requests for the same
+    url are shared, so two athletes from the same college only trigger one GET.
+    An optional persistent ResponseCache sits behind get_json so reruns skip documents fetched recently.
+    Requests are paced by a shared AdaptiveRate and counted in stats.
+    base is the API root league urls are built from, the real ESPN API unless pointed at a stand-in.
+    '''
+
+    def __init__(self, concurrency=16, timeout=10, cache=None, retries=4, rate=None, base=base_url):
+        self.base = base.rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.retries = retries
+        self.rate = rate or AdaptiveRate(burst=concurrency)
+        self.stats = FetchStats()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._refs = {}
+
+    def _session(self):
+        # requests sessions aren't guaranteed thread-safe so each worker gets its own
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def get_json(self, url):
+        '''
+        GET a JSON document. Returns None only when ESPN says it doesn't exist (404).
+        Throttling, 5xx, timeouts and broken bodies are retried with jittered backoff, and once the
+        retries run out a FetchError is raised so the caller can tell a failure from missing data.
+        '''
+
+        if self.cache is not None:
+            doc = self.cache.get(url)
+            if doc is not None:
+                return doc
+
+        for attempt in range(self.retries + 1):
+            self.rate.acquire()
+            kind, retry_after = None, None
+            with self._slots:
+                start = perf_counter()
+                try:
+                    r = self._session().get(url, timeout=self.timeout)
+                except requests.Timeout:
+                    kind = "timeout"
+                except requests.RequestException:
+                    kind = "connection"
+                self.stats.request(perf_counter() - start)
+
+            if kind is None:
+                if r.status_code == 404:
+                    self.stats.miss()
+                    self.rate.success()
+                    return None
+                if r.status_code in retry_statuses:
+                    kind = f"http_{r.status_code}"
+                    retry_after = retry_after_seconds(r)
+                elif r.status_code >= 400:
+                    # anything else (403, 400, ...) won't get better by asking again
+                    self.stats.error(f"http_{r.status_code}", retrying=False)
+                    raise FetchError(url, f"http_{r.status_code}")
+                else:
+                    try:
+                        doc = r.json()
+                    except ValueError:
+                        kind = "bad_json"
+                    else:
+                        self.rate.success()
+                        if self.cache is not None:
+                            self.cache.put(url, doc)
+                        return doc
+
+            retrying = attempt < self.retries
+            self.stats.error(kind, retrying)
+            if kind == "http_429":
+                self.rate.throttled(retry_after)
+            else:
+                self.rate.error()
+            if not retrying:
+                raise FetchError(url, kind)
+            sleep(max(retry_after or 0, backoff(attempt)))
+
+    def get_ref(self, url):
+        '''
+        Cached GET for shared reference documents.
+        The first caller for a url does the request, anyone else asking for it meanwhile waits on the same future.
+        '''
+
+        if not url:
+            return None
+        with self._lock:
+            future = self._refs.get(url)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._refs[url] = future
+        if owner:
+            try:
+                future.set_result(self.get_json(url))
+            except BaseException as e:
+                # don't memoize failures, the next athlete asking for this ref gets a fresh attempt
+                with self._lock:
+                    self._refs.pop(url, None)
+                future.set_exception(e)
+        return future.result()
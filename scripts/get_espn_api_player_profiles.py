@@ -1,12 +1,16 @@
-import requests
-import csv
-from time import sleep, time
+import argparse
+import re
+from collections import defaultdict
+from time import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import pandas as pd
 from pathlib import Path
 
-# set sport to scrape. only allows for one at a time with current setup
-sport = 'basketball'
+from espn_client import EspnClient, FetchError, base_url
+from http_cache import ResponseCache
+import scd
+from staging import StagingWriter, discard, read_checkpoint
 
 sport_map = {
     'football': 'nfl',
@@ -15,168 +19,164 @@ sport_map = {
     'basketball': 'nba'
 }
 
-league = sport_map.get(sport, 'unknown')
-
-headers = {"User-Agent": "college-script/1.0"}
-
-# v3 endpoint gets height, weight, dob, experience, etc.
-# v2 endpoint gets college information
-v3_list_url = f"https://sports.core.api.espn.com/v3/sports/{sport}/{league}/athletes?limit=18000"
-v2_ath_url = f"https://sports.core.api.espn.com/v2/sports/{sport}/leagues/{league}/athletes/{{}}"
+league_sports = {league: sport for sport, league in sport_map.items()}
 
 script_directory = Path(__file__).resolve().parent
 data_directory = script_directory.parent / "data" / "espn" / "player_profiles"
-output_csv = data_directory / f"{league}_espn_api_player_profiles.csv"
 
-# cache to speed things up
-college_cache = {}
-team_cache = {}
+# persistent cache of ESPN responses shared between runs and leagues
+cache_path = script_directory.parent / "data" / "espn" / "cache" / "espn_api_cache.sqlite"
+
+# column order of a profile row as it's staged and stored
+profile_columns = [
+    "uuid", "id", "league", "fullName", "firstName", "lastName", "position", "jersey", "active", "weight",
+    "height", "age", "dateOfBirth", "experience_years", "birthCity", "birthState", "birthCountry", "debutYear",
+    "college", "collegeId", "college_source", "college_history", "draftYear", "draftRound", "draftPick", "draftTeam", "team",
+    "processed_ts",
+]
 
-def get_json(url):
-    try:
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        return r.json()
-    except:
-        return None
+# v3 list fields compared on a refresh. a difference here means the player moved on in some way
+# (signed, retired, new number) so the v2 + ref chain is worth re-running. age is left out,
+# it changes on every birthday and is refreshed straight from the list instead
+fingerprint_columns = [
+    "fullName", "firstName", "lastName", "jersey", "active", "weight", "height", "dateOfBirth",
+    "experience_years", "birthCity", "birthState", "birthCountry",
+]
 
-def get_college_info(col_ref):
+# a college's team id in ESPN's college leagues is its college id, so the team ref of a season says
+# which college it was played at without fetching anything
+season_team = re.compile(r"/seasons/(\d+)/teams/(\d+)")
+
+def league_urls(league, base=base_url):
+    sport = league_sports[league]
+    # v3 endpoint gets height, weight, dob, experience, etc.
+    # v2 endpoint gets college information
+    v3_list_url = f"{base}/v3/sports/{sport}/{league}/athletes?limit=18000"
+    v2_ath_url = f"{base}/v2/sports/{sport}/leagues/{league}/athletes/{{}}"
+    return v3_list_url, v2_ath_url
+
+def get_college_info(client, col_ref):
     if not col_ref:
         return (None, None)
-    if col_ref in college_cache:
-        return college_cache[col_ref]
-    col_data = get_json(col_ref)
+    col_data = client.get_ref(col_ref)
     if col_data:
-        name = col_data.get("name")
-        college_id = col_data.get("id")
-        college_cache[col_ref] = (name, college_id)
-        return (name, college_id)
-    college_cache[col_ref] = (None, None)
+        return (col_data.get("name"), col_data.get("id"))
     return (None, None)
 
-    # try collegeAthlete first as that looks to be more reliable
+def get_college_athlete(client, v2_data):
+    ca_ref = (v2_data.get("collegeAthlete") or {}).get("$ref") if v2_data else None
+    return client.get_json(ca_ref) if ca_ref else None
 
-def get_colleges(v2_data):
-    ca_ref = (v2_data.get("collegeAthlete") or {}).get("$ref")
-    if ca_ref:
-        ca_data = get_json(ca_ref)
-        if ca_data:
-            col_ref = (ca_data.get("college") or {}).get("$ref")
-            if col_ref:
-                name, college_id = get_college_info(col_ref)
-                if name:
-                    return (name, college_id, "collegeAthlete")
+def get_colleges(client, v2_data, ca_data):
+    # try collegeAthlete first as that looks to be more reliable
+    if ca_data:
+        col_ref = (ca_data.get("college") or {}).get("$ref")
+        if col_ref:
+            name, college_id = get_college_info(client, col_ref)
+            if name:
+                return (name, college_id, "collegeAthlete")
     
     # fallback to direct college field if collegeAthlete doesn't work
     col_ref = (v2_data.get("college") or {}).get("$ref")
     if col_ref:
-        name, college_id = get_college_info(col_ref)
+        name, college_id = get_college_info(client, col_ref)
         if name:
             return (name, college_id, "direct")
     return ("", None, None)
 
-def get_team_abbrev(team_ref):
+def get_college_history(client, ca_data):
+    '''
+    Every college the athlete played a season at, from the college athlete's statistics log.
+    The log lists every season with its team ref inline, so the whole history is one request,
+    and colleges are read off those refs rather than fetched.
+    Returns {collegeId: [seasons]}, empty if there's no log.
+    '''
+
+    log_ref = ((ca_data or {}).get("statisticslog") or {}).get("$ref")
+    log = client.get_json(log_ref) if log_ref else None
+    seasons = defaultdict(set)
+    for entry in (log or {}).get("entries", []):
+        for item in entry.get("statistics", []):
+            match = season_team.search((item.get("team") or {}).get("$ref") or "")
+            if match:
+                seasons[int(match.group(2))].add(int(match.group(1)))
+    return {college_id: sorted(years) for college_id, years in seasons.items()}
+
+def format_college_history(history, college_id=None):
+    '''
+    Compact text form of a college history, colleges in the order they were attended:
+    "150:2020-2022;87:2023". A college known only from the college link has no seasons ("87").
+    '''
+
+    parts = [
+        f"{cid}:{years[0]}" + (f"-{years[-1]}" if years[-1] != years[0] else "")
+        for cid, years in sorted(history.items(), key=lambda item: item[1][0])
+    ]
+    if not parts and college_id not in (None, ""):
+        parts = [str(college_id)]
+    return ";".join(parts)
+
+def get_team_abbrev(client, team_ref):
     if not team_ref:
         return ""
-    if team_ref in team_cache:
-        return team_cache[team_ref]
-    team_data = get_json(team_ref)
+    team_data = client.get_ref(team_ref)
     if team_data:
-        abbrev = team_data.get("abbreviation") or team_data.get("abbrev")
-        team_cache[team_ref] = abbrev
-        return abbrev
-    team_cache[team_ref] = ""
+        return team_data.get("abbreviation") or team_data.get("abbrev")
     return ""
 
-def get_position(v2_data):
+def get_position(client, v2_data):
     if not v2_data:
         return ""
     pos_ref = (v2_data.get("position") or {}).get("$ref")
     if pos_ref:
-        pos_data = get_json(pos_ref)
+        pos_data = client.get_ref(pos_ref)
         if pos_data:
             return pos_data.get("abbreviation") or pos_data.get("name", "")
     return ""
 
-# get current timestamp each time we run this
-processed_ts = datetime.now().isoformat()
+def fetch_athlete_list(client, list_url, league=""):
+    # handle pagination. currently 2 pages to loop through
+    all_athletes = []
+    page = 1
 
-# handle pagination. currently 2 pages to loop through
-all_athletes = []
-page = 1
+    while True:
+        url = f"{list_url}&page={page}"
+        try:
+            v3_json = client.get_json(url)
+        except FetchError as e:
+            print(f"[{league}] Failed to get page {page}: {e}")
+            break
+        
+        if not v3_json:
+            print(f"[{league}] Failed to get page {page}")
+            break
+        
+        items = v3_json.get("items", [])
+        if not items:
+            break
+        
+        all_athletes.extend(items)
+        print(f"[{league}]   Retrieved {len(items)} players from page {page} (Total: {len(all_athletes)})")
+        
+        # check if there are more pages to scrape
+        page_count = v3_json.get("pageCount", 1)
+        if page >= page_count:
+            break
+        
+        page += 1
 
-while True:
-    url = f"{v3_list_url}&page={page}"
-    v3_json = get_json(url)
-    
-    if not v3_json:
-        print(f"Failed to get page {page}")
-        break
-    
-    items = v3_json.get("items", [])
-    if not items:
-        break
-    
-    all_athletes.extend(items)
-    print(f"  Retrieved {len(items)} players from page {page} (Total: {len(all_athletes)})")
-    
-    # check if there are more pages to scrape
-    page_count = v3_json.get("pageCount", 1)
-    if page >= page_count:
-        break
-    
-    page += 1
-    sleep(0.5)
-
-print(f"\nTotal athletes retrieved: {len(all_athletes)}")
-
-# exclude specific IDs. bad/irrelevant data
-exclude_ids = {"4246273", "4246281", "4246289", "4246247", "4246272", "4246274"}
-athletes = [a for a in all_athletes if str(a.get("id")) not in exclude_ids]
-
-# find which players we've already scraped to speed up process
-# old data may become stagnant, but only for fields dynamically changing such as age, experience, etc. 
-# we can take those dependencies out of app so once we pull it once we only need to process new records
-# other data is set in stone such as draft year, college, name, etc.
-if output_csv.exists():
-    existing_df = pd.read_csv(output_csv)
-    existing_ids = set(existing_df['uuid'].astype(str).unique())
-    print(f"\nFound {len(existing_ids)} existing ESPN UUIDs in database")
-    
-    athletes_before = len(athletes)
-    athletes = [a for a in athletes if f"{a.get('id')}_{league}" not in existing_ids]
-    print(f"Filtered out {athletes_before - len(athletes)} existing players")
-    print(f"Processing {len(athletes)} new players")
-    
-    if len(athletes) == 0:
-        print("No new players to process")
-        exit(0)
-else:
-    print("No existing data found so processing all players")
+    return all_athletes
 
-results = []
-start_time = time()
+def summary_fields(athlete):
+    '''
+    Profile fields that come straight from a v3 list item, no extra calls needed.
+    '''
 
-for i, athlete in enumerate(athletes):
-    aid = athlete.get("id")
-    v2_data = get_json(v2_ath_url.format(aid))
-    
-    draft = v2_data.get("draft", {}) if v2_data else {}
-    draft_team_ref = (draft.get("team") or {}).get("$ref")
-    team_ref = (v2_data.get("team") or {}).get("$ref") if v2_data else None
     birthPlace = athlete.get("birthPlace") or {}
-    
-    # get college with source and ID
-    college, college_id, college_source = get_colleges(v2_data) if v2_data else ("", None, None)
-    
-    row = {
-        "uuid": f"{aid}_{league}",
-        "id": aid,
-        "league": league,
+    return {
         "fullName": athlete.get("fullName"),
         "firstName": athlete.get("firstName"),
         "lastName": athlete.get("lastName"),
-        "position": get_position(v2_data),
         "jersey": athlete.get("jersey"),
         "active": athlete.get("active"),
         "weight": athlete.get("weight"),
@@ -187,72 +187,288 @@ for i, athlete in enumerate(athletes):
         "birthCity": birthPlace.get("city", ""),
         "birthState": birthPlace.get("state", ""),
         "birthCountry": birthPlace.get("country", ""),
+    }
+
+def plan_refresh(athletes, snapshot, league, processed_ts):
+    '''
+    Splits the listed athletes by comparing a fingerprint of their v3 summary with the stored open version.
+    Returns the athletes that need the full v2 + ref chain (new or fingerprint changed), rows for unchanged
+    athletes whose age moved (built from the stored row, no calls), and counts of each.
+    '''
+
+    listed = pd.DataFrame(
+        [{"uuid": f"{a.get('id')}_{league}", **summary_fields(a)} for a in athletes],
+        columns=["uuid"] + list(summary_fields({})),
+    ).set_index("uuid")
+
+    # older tables stack every pull, the last pull of each player is its open version
+    stored = snapshot.sort_values("processed_ts").drop_duplicates("uuid", keep="last").set_index("uuid")
+    stored = stored.reindex(listed.index)
+    known = listed.index.isin(snapshot["uuid"])
+
+    changed = known & (scd.row_hashes(listed, fingerprint_columns) != scd.row_hashes(stored, fingerprint_columns)).to_numpy()
+    aged = known & ~changed & (scd.canonical(listed["age"]) != scd.canonical(stored["age"])).to_numpy()
+
+    refresh = set(listed.index[~known | changed])
+    detail = [a for a in athletes if f"{a.get('id')}_{league}" in refresh]
+
+    light = stored[aged].copy()
+    light["age"] = listed.loc[aged, "age"]
+    light["processed_ts"] = processed_ts
+    light = light.reset_index().reindex(columns=profile_columns).astype(object)
+    light_rows = light.where(light.notna(), "").to_dict("records")
+
+    counts = {
+        "new": int((~known).sum()),
+        "changed": int(changed.sum()),
+        "aged": int(aged.sum()),
+        "unchanged": int((known & ~changed & ~aged).sum()),
+    }
+    return detail, light_rows, counts
+
+def build_row(client, ref_pool, athlete, league, athlete_url, processed_ts):
+    '''
+    Resolves one athlete into a profile row.
+    After the v2 athlete GET, the collegeAthlete document, position and both team refs are fanned out to ref_pool,
+    then the college and the college history off the collegeAthlete document, so the athlete's latency is its
+    slowest chain rather than the sum of every call. Tasks on ref_pool never wait on ref_pool themselves.
+    '''
+
+    aid = athlete.get("id")
+    v2_data = client.get_json(athlete_url.format(aid))
+    
+    draft = v2_data.get("draft", {}) if v2_data else {}
+    draft_team_ref = (draft.get("team") or {}).get("$ref")
+    team_ref = (v2_data.get("team") or {}).get("$ref") if v2_data else None
+
+    college_athlete = ref_pool.submit(get_college_athlete, client, v2_data)
+    position = ref_pool.submit(get_position, client, v2_data)
+    draft_team = ref_pool.submit(get_team_abbrev, client, draft_team_ref)
+    team = ref_pool.submit(get_team_abbrev, client, team_ref)
+
+    # get college with source and ID, and every college played at
+    ca_data = college_athlete.result()
+    colleges = ref_pool.submit(get_colleges, client, v2_data, ca_data) if v2_data else None
+    history = ref_pool.submit(get_college_history, client, ca_data)
+    college, college_id, college_source = colleges.result() if colleges else ("", None, None)
+    
+    row = {
+        "uuid": f"{aid}_{league}",
+        "id": aid,
+        "league": league,
+        **summary_fields(athlete),
+        "position": position.result(),
         "debutYear": v2_data.get("debutYear") if v2_data else "",
         "college": college,
         "collegeId": college_id,
         "college_source": college_source,
+        "college_history": format_college_history(history.result(), college_id),
         "draftYear": draft.get("year", ""),
         "draftRound": draft.get("round", ""),
         "draftPick": draft.get("selection", ""),
-        "draftTeam": get_team_abbrev(draft_team_ref),
-        "team": get_team_abbrev(team_ref),
+        "draftTeam": draft_team.result(),
+        "team": team.result(),
         "processed_ts": processed_ts
     }
-    
-    results.append(row)
-    
-    # progress tracker
-    # print out estimated time remaining
-    if (i + 1) % 10 == 0:
-        elapsed = time() - start_time
-        rate = (i + 1) / elapsed
-        remaining = (len(athletes) - (i + 1)) / rate
-        print(f"Processed {i + 1}/{len(athletes)} - {rate:.1f}/sec - Estimated. {remaining/60:.1f} mins remaining")
-    
-    # sleep between api requests
-    sleep(0.05)
-
-# load existing data if file exists
-if output_csv.exists():
-    existing_df = pd.read_csv(output_csv)
-    print(f"Loading {len(existing_df)} existing records to append new data")
-else:
-    existing_df = pd.DataFrame()
-    print("No existing file found so creating a new dataset")
-
-new_df = pd.DataFrame(results)
-
-# combine old and new data
-if not existing_df.empty:
-    combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-else:
-    combined_df = new_df
-
-if 'is_latest' in combined_df.columns:
-    combined_df = combined_df.drop(columns=['is_latest'])
-
-# ensure id is string
-combined_df['id'] = combined_df['id'].astype(str)
-
-# sort most recent first
-combined_df = combined_df.sort_values('processed_ts', ascending=False)
-
-# SCD table - mark is_latest 1 for most recent record per id, 0 for all others
-combined_df['is_latest'] = 0
-mask = ~combined_df.duplicated(subset=['uuid'], keep='first')
-combined_df.loc[mask, 'is_latest'] = 1
-combined_df.to_csv(output_csv, index=False)
-
-# summary statistics of last pull
-elapsed = time() - start_time
-print(f"\nDone, processed {len(new_df)} players in {elapsed/60:.1f} minutes")
-print(f"Total records: {len(combined_df)}")
-print(f"Latest records: {len(combined_df[combined_df['is_latest'] == 1])}")
-print(f"Historical records: {len(combined_df[combined_df['is_latest'] == 0])}")
-
-# show college source breakdown for latest records
-latest = combined_df[combined_df['is_latest'] == 1]
-print(f"College source breakdown (latest records):")
-print(f"From collegeAthlete: {len(latest[latest['college_source'] == 'collegeAthlete'])}")
-print(f"From direct: {len(latest[latest['college_source'] == 'direct'])}")
-print(f"No college found: {len(latest[latest['college_source'].isna()])}")
\ No newline at end of file
+    return {col: row[col] for col in profile_columns}
+
+def iter_rows(client, athletes, league, athlete_url, processed_ts, failures=None):
+    '''
+    Resolves every athlete with bounded parallelism and yields rows as they finish.
+    Only a small window of athletes is submitted at a time so memory stays flat however many there are.
+    Athletes with a request that failed after every retry are skipped rather than yielded with holes,
+    and their ids are appended to failures.
+    '''
+
+    start_time = time()
+    window = client.concurrency * 4
+    pending = set()
+    queue = iter(athletes)
+    done = 0
+
+    # athlete workers and ref workers are separate pools so an athlete waiting on its refs can never
+    # starve the pool that resolves them. total requests in flight are still capped by the client
+    with ThreadPoolExecutor(max_workers=client.concurrency) as athlete_pool, \
+            ThreadPoolExecutor(max_workers=client.concurrency) as ref_pool:
+        while True:
+            for athlete in queue:
+                pending.add(athlete_pool.submit(build_row, client, ref_pool, athlete, league, athlete_url, processed_ts))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done += 1
+                try:
+                    row = future.result()
+                except FetchError as e:
+                    print(f"[{league}] Skipping athlete, {e}")
+                    if failures is not None:
+                        failures.append(e.url)
+                else:
+                    yield row
+
+                # progress tracker
+                # print out estimated time remaining
+                if done % 10 == 0:
+                    elapsed = time() - start_time
+                    rate = done / elapsed
+                    remaining = (len(athletes) - done) / rate
+                    print(f"[{league}] Processed {done}/{len(athletes)} - {rate:.1f}/sec - Estimated. {remaining/60:.1f} mins remaining - {client.stats.progress()}")
+
+def scrape_athletes(client, athletes, league, athlete_url, processed_ts):
+    '''
+    Resolves every athlete and returns rows in the same order as athletes.
+    '''
+
+    order = {str(a.get("id")): i for i, a in enumerate(athletes)}
+    rows = list(iter_rows(client, athletes, league, athlete_url, processed_ts))
+    return sorted(rows, key=lambda row: order[str(row["id"])])
+
+def scrape_league(client, league, output_dir, processed_ts, resume=False, refresh=False, backfill_history=False):
+    '''
+    Scrapes one league's new athletes and merges them into its SCD profile csv in output_dir.
+    The csv holds the open version of each player, closed versions go to output_dir/history/<league>/<year>.csv.
+    Rows stream to a staging csv as they finish and are only merged into the output once the scrape completes.
+    With resume, athletes already in the checkpoint from an interrupted run are skipped.
+    With refresh, existing players whose v3 summary changed are re-scraped too (see plan_refresh).
+    With backfill_history, existing players stored without a college history are re-scraped too.
+    '''
+
+    v3_list_url, v2_ath_url = league_urls(league, client.base)
+    output_csv = output_dir / f"{league}_espn_api_player_profiles.csv"
+    staging_directory = output_dir / "staging"
+    staging_directory.mkdir(parents=True, exist_ok=True)
+    staging_csv = staging_directory / f"{league}_staging.csv"
+    checkpoint = staging_directory / f"{league}_checkpoint.txt"
+
+    if resume:
+        finished_ids = read_checkpoint(checkpoint)
+        print(f"[{league}] Resuming with {len(finished_ids)} athletes already staged")
+    else:
+        # leftovers from an interrupted run are dropped unless we were asked to resume
+        discard(staging_csv, checkpoint)
+        finished_ids = set()
+
+    all_athletes = fetch_athlete_list(client, v3_list_url, league)
+
+    print(f"\n[{league}] Total athletes retrieved: {len(all_athletes)}")
+
+    # exclude specific IDs. bad/irrelevant data
+    exclude_ids = {"4246273", "4246281", "4246289", "4246247", "4246272", "4246274"}
+    athletes = [a for a in all_athletes if str(a.get("id")) not in exclude_ids]
+    listed = athletes
+
+    light_rows = []
+    if refresh and output_csv.exists():
+        # the v3 list already tells us enough to see who changed, so the expensive chain only runs for them
+        snapshot = scd.read_snapshot(output_csv)
+        athletes, light_rows, counts = plan_refresh(athletes, snapshot, league, processed_ts)
+        print(f"\n[{league}] Refresh against {snapshot['uuid'].nunique()} existing players: "
+              f"{counts['new']} new, {counts['changed']} changed, {counts['aged']} age only, {counts['unchanged']} unchanged")
+    elif output_csv.exists():
+        # find which players we've already scraped to speed up process
+        # without --refresh existing players are never revisited, so fields like team or active can go stale
+        existing_ids = set(pd.read_csv(output_csv, usecols=['uuid'])['uuid'].astype(str).unique())
+        print(f"\n[{league}] Found {len(existing_ids)} existing ESPN UUIDs in database")
+        
+        athletes_before = len(athletes)
+        athletes = [a for a in athletes if f"{a.get('id')}_{league}" not in existing_ids]
+        print(f"[{league}] Filtered out {athletes_before - len(athletes)} existing players")
+    else:
+        print(f"[{league}] No existing data found so processing all players")
+
+    if backfill_history and output_csv.exists():
+        # players scraped before college histories were collected go through the detail chain once more
+        stored = pd.read_csv(output_csv, usecols=lambda c: c in ("uuid", "college_history"), dtype=str)
+        missing = set(stored["uuid"]) if "college_history" not in stored else set(stored.loc[stored["college_history"].isna(), "uuid"])
+        queued = {f"{a.get('id')}_{league}" for a in athletes}
+        backfill = [a for a in listed if f"{a.get('id')}_{league}" in missing - queued]
+        athletes = athletes + backfill
+        backfilled = {str(a.get("id")) for a in backfill}
+        light_rows = [row for row in light_rows if str(row["id"]) not in backfilled]
+        print(f"[{league}] Backfilling college history for {len(backfill)} existing players")
+
+    athletes = [a for a in athletes if str(a.get("id")) not in finished_ids]
+    light_rows = [row for row in light_rows if str(row["id"]) not in finished_ids]
+    print(f"[{league}] Processing {len(athletes)} players through the detail endpoints")
+
+    if len(athletes) == 0 and not light_rows and not finished_ids:
+        print(f"[{league}] No new players to process")
+        return
+
+    start_time = time()
+    writer = StagingWriter(staging_csv, checkpoint)
+    for row in light_rows:
+        writer.add(row)
+    failures = []
+    for row in iter_rows(client, athletes, league, v2_ath_url, processed_ts, failures):
+        writer.add(row)
+    writer.close()
+
+    # final compaction of staged rows into the SCD output
+    staged = pd.read_csv(staging_csv, dtype=str) if staging_csv.exists() else pd.DataFrame(columns=["uuid", "processed_ts"])
+    latest, merge_stats = scd.merge(staged, output_csv, output_dir / "history", league)
+    discard(staging_csv, checkpoint)
+
+    # summary statistics of last pull
+    elapsed = time() - start_time
+    print(f"\n[{league}] Done, processed {writer.written} players in {elapsed/60:.1f} minutes")
+    print(f"[{league}] New players: {merge_stats['inserted']}")
+    print(f"[{league}] Changed players: {merge_stats['changed']}")
+    print(f"[{league}] Unchanged players: {merge_stats['unchanged']}")
+    print(f"[{league}] Versions closed into history: {merge_stats['closed']}")
+    # failed athletes never reach the output, so the next run picks them up again
+    print(f"[{league}] Failed after retries (retried next run): {len(failures)}")
+    print(f"[{league}] Latest records: {len(latest)}")
+
+    # show college source breakdown for latest records
+    print(f"[{league}] College source breakdown (latest records):")
+    print(f"[{league}] From collegeAthlete: {len(latest[latest['college_source'] == 'collegeAthlete'])}")
+    print(f"[{league}] From direct: {len(latest[latest['college_source'] == 'direct'])}")
+    print(f"[{league}] No college found: {len(latest[latest['college_source'].isna()])}")
+    if "college_history" in latest.columns:
+        transfers = latest["college_history"].fillna("").str.contains(";")
+        print(f"[{league}] Played at more than one college: {int(transfers.sum())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape ESPN player profiles for one or more leagues")
+    parser.add_argument("--leagues", default="nfl,nba,mlb,nhl", help="comma separated leagues to scrape")
+    parser.add_argument("--concurrency", type=int, default=16, help="max ESPN requests in flight across all leagues")
+    parser.add_argument("--output-dir", type=Path, default=data_directory)
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run from its staging checkpoint")
+    parser.add_argument("--refresh", action="store_true", help="also re-scrape existing players whose v3 summary changed")
+    parser.add_argument("--backfill-history", action="store_true", help="also re-scrape existing players stored without a college history")
+    parser.add_argument("--cache-path", type=Path, default=cache_path, help="sqlite file for the persistent response cache")
+    parser.add_argument("--base-url", default=base_url, help="API root, ie. http://127.0.0.1:8765 for mock_espn_server.py")
+    args = parser.parse_args()
+
+    leagues = [l.strip().lower() for l in args.leagues.split(",") if l.strip()]
+    unknown = [l for l in leagues if l not in league_sports]
+    if unknown:
+        parser.error(f"unknown leagues: {', '.join(unknown)}")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    # one client for every league so colleges shared across leagues are only fetched once
+    cache = ResponseCache(args.cache_path)
+    client = EspnClient(concurrency=args.concurrency, cache=cache, base=args.base_url)
+
+    # get current timestamp each time we run this
+    processed_ts = datetime.now().isoformat()
+
+    with ThreadPoolExecutor(max_workers=len(leagues)) as pool:
+        futures = [pool.submit(scrape_league, client, league, args.output_dir, processed_ts, args.resume, args.refresh,
+                               args.backfill_history) for league in leagues]
+        for future in futures:
+            future.result()
+
+    for line in client.stats.summary() + cache.summary():
+        print(line)
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
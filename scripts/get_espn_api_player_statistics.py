@@ -0,0 +1,189 @@
+import argparse
+import os
+import re
+from time import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+
+from espn_client import EspnClient, FetchError, base_url
+from http_cache import ResponseCache
+from get_espn_api_player_profiles import league_sports, cache_path, data_directory as profile_directory
+from player_stats import partition_path, statistics_schema
+
+# per-season regular season statistics for every player in the profile pulls, one parquet partition per league
+#   python get_espn_api_player_statistics.py --leagues nfl,nba,mlb,nhl --concurrency 16
+# run it after get_espn_api_player_profiles.py, the athletes come from the league's profile csv
+
+script_directory = Path(__file__).resolve().parent
+statistics_directory = script_directory.parent / "data" / "espn" / "statistics"
+
+# a season's regular season totals (type 2), as linked from the athlete's statistics log
+season_statistics = re.compile(r"/seasons/(\d+)/types/2/athletes/\d+/statistics")
+
+# rows buffered before they're written out as a row group
+row_group_size = 100_000
+
+
+def league_url(league, base=base_url):
+    return f"{base}/v2/sports/{league_sports[league]}/leagues/{league}/athletes/{{}}/statisticslog"
+
+
+def season_rows(aid, season, doc):
+    # (id, season, category, stat, value) for every numeric stat in a season's statistics document
+    rows = []
+    for category in ((doc or {}).get("splits") or {}).get("categories", []):
+        for stat in category.get("stats", []):
+            value = stat.get("value")
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                rows.append((int(aid), season, category.get("name"), stat.get("name"), float(value)))
+    return rows
+
+
+def athlete_statistics(client, season_pool, aid, log_url):
+    '''
+    Every regular season stat of one athlete. The statistics log lists a season total per season played,
+    those are fanned out to season_pool so the athlete's latency is one log GET plus its slowest season.
+    Tasks on season_pool never wait on season_pool themselves.
+    '''
+
+    log = client.get_json(log_url.format(aid))
+    seasons = []
+    for entry in (log or {}).get("entries", []):
+        for item in entry.get("statistics", []):
+            # traded players also have a split per team, the total already covers them
+            ref = (item.get("statistics") or {}).get("$ref") or ""
+            match = season_statistics.search(ref)
+            if item.get("type") == "total" and match:
+                seasons.append((int(match.group(1)), season_pool.submit(client.get_json, ref)))
+    return [row for season, future in seasons for row in season_rows(aid, season, future.result())]
+
+
+def iter_statistics(client, ids, league, failures):
+    '''
+    Fetches every athlete's statistics with bounded parallelism and yields each athlete's rows as they finish.
+    Athletes with a request that failed after every retry are skipped and their ids appended to failures.
+    '''
+
+    log_url = league_url(league, client.base)
+    start_time = time()
+    window = client.concurrency * 4
+    pending = set()
+    queue = iter(ids)
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=client.concurrency) as athlete_pool, \
+            ThreadPoolExecutor(max_workers=client.concurrency) as season_pool:
+        while True:
+            for aid in queue:
+                future = athlete_pool.submit(athlete_statistics, client, season_pool, aid, log_url)
+                future.aid = aid
+                pending.add(future)
+                if len(pending) >= window:
+                    break
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done += 1
+                try:
+                    yield future.result()
+                except FetchError as e:
+                    print(f"[{league}] Skipping athlete, {e}")
+                    failures.append(future.aid)
+
+                if done % 100 == 0:
+                    elapsed = time() - start_time
+                    rate = done / elapsed
+                    remaining = (len(ids) - done) / rate
+                    print(f"[{league}] Processed {done}/{len(ids)} - {rate:.1f}/sec - Estimated. {remaining/60:.1f} mins remaining - {client.stats.progress()}")
+
+
+def write_batch(writer, rows):
+    ids, seasons, categories, stats, values = zip(*rows)
+    writer.write_table(pa.table([ids, seasons, categories, stats, values], schema=statistics_schema))
+
+
+def scrape_league(client, league, profiles_dir, output_dir):
+    '''
+    Pulls the statistics of every player in the league's profile csv into output_dir/league=<league>/.
+    Rows go to the parquet file a row group at a time as athletes finish, so memory stays flat however many
+    seasons there are. The new file replaces the old one once it's complete, and athletes that failed keep
+    the rows they had in the old one.
+    '''
+
+    profiles_csv = profiles_dir / f"{league}_espn_api_player_profiles.csv"
+    if not profiles_csv.exists():
+        print(f"[{league}] No profile csv at {profiles_csv}, pull profiles first")
+        return
+    ids = pd.read_csv(profiles_csv, usecols=["id"], dtype=str)["id"].dropna().drop_duplicates().tolist()
+    print(f"[{league}] Fetching statistics for {len(ids)} players")
+
+    path = partition_path(output_dir, league)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # the underscore keeps a half written file out of the dataset, pyarrow skips _ and . prefixed files when scanning
+    tmp_path = path.with_name("_" + path.name + ".tmp")
+    start_time = time()
+    failures = []
+    buffer = []
+    written = players = 0
+    with pq.ParquetWriter(tmp_path, statistics_schema, compression="zstd") as writer:
+        for rows in iter_statistics(client, ids, league, failures):
+            players += bool(rows)
+            buffer.extend(rows)
+            if len(buffer) >= row_group_size:
+                write_batch(writer, buffer)
+                written += len(buffer)
+                buffer = []
+
+        if failures and path.exists():
+            # failed athletes are retried next run, until then their previous rows stand
+            kept = ds.dataset(path, schema=statistics_schema).to_table(filter=ds.field("id").isin([int(i) for i in failures]))
+            if kept.num_rows:
+                writer.write_table(kept)
+                written += kept.num_rows
+        if buffer:
+            write_batch(writer, buffer)
+            written += len(buffer)
+    os.replace(tmp_path, path)
+
+    elapsed = time() - start_time
+    print(f"\n[{league}] Done in {elapsed/60:.1f} minutes, {written:,} stat rows for {players} players")
+    print(f"[{league}] No statistics: {len(ids) - players - len(failures)}")
+    print(f"[{league}] Failed after retries (kept previous rows, retried next run): {len(failures)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape ESPN per-season player statistics for one or more leagues")
+    parser.add_argument("--leagues", default="nfl,nba,mlb,nhl", help="comma separated leagues to scrape")
+    parser.add_argument("--concurrency", type=int, default=16, help="max ESPN requests in flight across all leagues")
+    parser.add_argument("--profiles-dir", type=Path, default=profile_directory, help="where the league profile csvs are")
+    parser.add_argument("--output-dir", type=Path, default=statistics_directory)
+    parser.add_argument("--cache-path", type=Path, default=cache_path, help="sqlite file for the persistent response cache")
+    parser.add_argument("--base-url", default=base_url, help="API root, ie. http://127.0.0.1:8765 for mock_espn_server.py")
+    args = parser.parse_args()
+
+    leagues = [l.strip().lower() for l in args.leagues.split(",") if l.strip()]
+    unknown = [l for l in leagues if l not in league_sports]
+    if unknown:
+        parser.error(f"unknown leagues: {', '.join(unknown)}")
+
+    cache = ResponseCache(args.cache_path)
+    client = EspnClient(concurrency=args.concurrency, cache=cache, base=args.base_url)
+
+    with ThreadPoolExecutor(max_workers=len(leagues)) as pool:
+        futures = [pool.submit(scrape_league, client, league, args.profiles_dir, args.output_dir) for league in leagues]
+        for future in futures:
+            future.result()
+
+    for line in client.stats.summary() + cache.summary():
+        print(line)
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter
+from time import time
+
+day = 24 * 60 * 60
+
+# how long a cached response stays fresh per url class, in seconds
+# colleges and positions almost never change, teams rarely, athletes often
+# a college statistics log only grows while the athlete is still in college, pros are long done
+# a pro's statistics log and season totals move with every game they play
+# anything not listed here (ie. the v3 athlete list) is never cached
+default_ttls = {
+    "college": 180 * day,
+    "position": 365 * day,
+    "team": 7 * day,
+    "athlete": 1 * day,
+    "college_history": 30 * day,
+    "statistics": 1 * day,
+}
+
+url_classes = [
+    ("college", re.compile(r"/colleges/\d+")),
+    ("position", re.compile(r"/positions/\d+")),
+    ("team", re.compile(r"/teams/\d+")),
+    ("college_history", re.compile(r"/leagues/college-[^/]+/athletes/\d+/statisticslog")),
+    ("statistics", re.compile(r"/athletes/\d+/statistics")),
+    ("athlete", re.compile(r"/v2/.*/athletes/\d+")),
+]
+
+
+def classify(url):
+    for name, pattern in url_classes:
+        if pattern.search(url):
+            return name
+    return None
+
+
+class ResponseCache:
+    '''
+    Persistent SQLite cache of ESPN JSON responses keyed by url.
+    Entries expire per url class (see default_ttls) and the least recently used ones are evicted
+    once the stored bodies exceed max_bytes. Safe to share between threads.
+    '''
+
+    def __init__(self, path, ttls=None, max_bytes=256 * 1024 * 1024, commit_every=200):
+        self.path = path
+        self.ttls = default_ttls if ttls is None else ttls
+        self.max_bytes = max_bytes
+        self.commit_every = commit_every
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evicted = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, url_class TEXT, body TEXT, size INTEGER, fetched_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url):
+        url_class = classify(url)
+        ttl = self.ttls.get(url_class)
+        if not ttl:
+            return None
+        now = time()
+        with self._lock:
+            row = self._db.execute("SELECT body, fetched_at FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None or now - row[1] > ttl:
+                self.misses[url_class] += 1
+                return None
+            self.hits[url_class] += 1
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+            self._maybe_commit()
+        return json.loads(row[0])
+
+    def put(self, url, doc):
+        url_class = classify(url)
+        if not self.ttls.get(url_class):
+            return
+        body = json.dumps(doc, separators=(",", ":"))
+        now = time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, url_class, body, len(body), now, now),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+            self._maybe_commit()
+
+    def _evict(self):
+        # drop least recently used entries until we're back under 90% of the budget
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        victims = []
+        for url, size in rows:
+            if self._size <= target:
+                break
+            victims.append((url,))
+            self._size -= size
+        self._db.executemany("DELETE FROM responses WHERE url = ?", victims)
+        self.evicted += len(victims)
+
+    def _maybe_commit(self):
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._db.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def summary(self):
+        lines = [f"Response cache: {self._size / 1024 / 1024:.1f} MB stored, {self.evicted} evicted this run"]
+        for url_class in self.ttls:
+            hits, misses = self.hits[url_class], self.misses[url_class]
+            total = hits + misses
+            rate = hits / total * 100 if total else 0
+            lines.append(f"  {url_class}: {hits} hits / {misses} misses ({rate:.0f}% hit rate)")
+        return lines
@@ -0,0 +1,203 @@
+import argparse
+import heapq
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter, sleep
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from mock_espn_server import MockEspn, serve
+
+# drives N simulated sessions of the app in one process, the way one server process would serve them:
+# every session shares the cached player store, index and score store, and each action is a real rerun
+#   python load_test_app.py --sessions 50 --duration 60 --think 6
+#   python load_test_app.py --sessions 20 --duration 30 --think 0     # saturation, how many reruns/s we top out at
+# AppTest runs one script at a time per process, so sessions are interleaved rather than parallel.
+# that matches the real server closely enough: reruns are CPU bound and share one GIL
+
+script_directory = Path(__file__).resolve().parent
+app_path = script_directory.parent / "app.py"
+player_artifact = script_directory.parent / "data" / "app_data" / "player_profile_data.parquet"
+
+
+def rss_mb():
+    # current resident set size. /proc is linux only, elsewhere fall back to the peak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Session:
+    '''
+    One simulated player. Each action is a rerun: a guess (right about half the time), a filter change,
+    or a challenge flag after a wrong answer.
+    '''
+
+    def __init__(self, number, players, colleges, rng, timeout=60):
+        self.number = number
+        self.players = players
+        self.colleges = colleges
+        self.rng = rng
+        self.app = AppTest.from_file(str(app_path), default_timeout=timeout)
+        self.app.query_params["u"] = f"load-{number}"
+        self.last_wrong = False
+
+    def widget(self, elements, label):
+        return next(e for e in elements if e.label == label)
+
+    def start(self):
+        self.app.run()
+
+    def guess(self):
+        current = self.app.session_state["current"] if "current" in self.app.session_state else None
+        if current is None:
+            return self.change_filters()
+        college = self.players.at[current, "college"]
+        right = self.rng.random() < 0.5
+        text = college if right else self.rng.choice(self.colleges)
+        self.app.text_input(key="guess_input").input(text)
+        self.widget(self.app.button, "Submit guess").click().run()
+        self.last_wrong = self.app.session_state["last_result"][0] == "incorrect"
+        return "guess"
+
+    def change_filters(self):
+        sport = self.widget(self.app.radio, "Sport")
+        sport.set_value(self.rng.choice(["All", "All", "NFL", "NFL", "NBA", "MLB", "NHL"]))
+        self.widget(self.app.radio, "Player Status").set_value(self.rng.choice(["Active", "All Players"]))
+        self.app.run()
+        position = self.widget(self.app.selectbox, "Position")
+        position.set_value(self.rng.choice(position.options[:6])).run()
+        return "filter"
+
+    def challenge(self):
+        self.last_wrong = False
+        self.app.button(key="challenge_button").click().run()
+        return "challenge"
+
+    def act(self, filter_rate, challenge_rate):
+        if self.last_wrong and self.rng.random() < challenge_rate:
+            return self.challenge()
+        if self.rng.random() < filter_rate:
+            return self.change_filters()
+        return self.guess()
+
+
+def percentiles(values):
+    ms = np.array(values) * 1000
+    if not len(ms):
+        return {}
+    return {f"p{p}_ms": round(float(np.percentile(ms, p)), 1) for p in (50, 90, 95, 99)} | {"max_ms": round(float(ms.max()), 1)}
+
+
+def run(args):
+    '''
+    Warms the caches with one session, starts the rest, then runs actions until duration is up.
+    Each session waits an exponential think time (mean args.think seconds) between actions. When the process
+    can't keep up, actions start late, and that lag is reported next to the rerun latency.
+    '''
+
+    rng = random.Random(args.seed)
+    players = pd.read_parquet(player_artifact, columns=["college"])
+    colleges = sorted(players["college"].dropna().unique())
+
+    base_rss = rss_mb()
+    start = perf_counter()
+    sessions = [Session(0, players, colleges, random.Random(rng.random()))]
+    sessions[0].start()
+    warm_seconds = perf_counter() - start
+    warm_rss = rss_mb()
+    for number in range(1, args.sessions):
+        sessions.append(Session(number, players, colleges, random.Random(rng.random())))
+        sessions[-1].start()
+    started_rss = rss_mb()
+
+    latencies = {"guess": [], "filter": [], "challenge": []}
+    lags = []
+    errors = 0
+    begin = perf_counter()
+    due = [(begin + rng.expovariate(1 / args.think) if args.think else begin, s.number) for s in sessions]
+    heapq.heapify(due)
+    while due:
+        at, number = heapq.heappop(due)
+        now = perf_counter()
+        if at - begin > args.duration:
+            break
+        if at > now:
+            sleep(at - now)
+        action_start = perf_counter()
+        lags.append(action_start - at)
+        try:
+            action = sessions[number].act(args.filter_rate, args.challenge_rate)
+            latencies[action].append(perf_counter() - action_start)
+        except Exception as e:
+            errors += 1
+            print(f"session {number}: {type(e).__name__}: {e}")
+        end = perf_counter()
+        heapq.heappush(due, (end + (rng.expovariate(1 / args.think) if args.think else 0), number))
+    elapsed = perf_counter() - begin
+    end_rss = rss_mb()
+
+    reruns = sum(len(v) for v in latencies.values())
+    return {
+        "sessions": args.sessions,
+        "think_seconds": args.think,
+        "duration_seconds": round(elapsed, 1),
+        "reruns": reruns,
+        "reruns_per_sec": round(reruns / elapsed, 2),
+        "errors": errors,
+        "latency": {"all": percentiles(sum(latencies.values(), []))} | {k: percentiles(v) for k, v in latencies.items()},
+        "lag": percentiles(lags),
+        "first_session_seconds": round(warm_seconds, 2),
+        "rss_mb": {"before": round(base_rss, 1), "warm": round(warm_rss, 1), "started": round(started_rss, 1),
+                   "end": round(end_rss, 1)},
+        "rss_mb_per_session": {
+            "at_start": round((started_rss - warm_rss) / max(args.sessions - 1, 1), 2),
+            "at_end": round((end_rss - warm_rss) / max(args.sessions - 1, 1), 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions of the app in one process")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60, help="seconds of simulated play")
+    parser.add_argument("--think", type=float, default=6.0, help="mean seconds between a session's actions, 0 for none")
+    parser.add_argument("--filter-rate", type=float, default=0.1, help="share of actions that change filters")
+    parser.add_argument("--challenge-rate", type=float, default=0.2, help="share of wrong answers that get challenged")
+    parser.add_argument("--cdn-latency", type=float, default=0.0, help="seconds added to every stubbed headshot check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the report as json here")
+    args = parser.parse_args()
+
+    # headshot HEAD checks go to the local stand-in and guesses to a throwaway score store,
+    # both have to be set before the app's first run imports wdtb.headshots
+    cdn = MockEspn(n_athletes=1, latency=args.cdn_latency)
+    server = serve(cdn)
+    os.environ["ESPN_CDN_BASE"] = cdn.base
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["WDTB_SCORES_PATH"] = str(Path(tmp) / "scores.sqlite")
+        report = run(args)
+    server.shutdown()
+    report["headshot_checks"] = cdn.calls["image"]
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if report["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
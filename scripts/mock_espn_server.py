@@ -0,0 +1,376 @@
+import argparse
+import json
+import random
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import sleep
+from urllib.parse import parse_qs, urlparse
+
+# local stand-in for the ESPN core API so the scraper can be exercised offline
+# every document is generated from the athlete/college/team id so runs are reproducible,
+# unless a recorded fixture exists for its path (see record_espn_fixtures.py)
+
+# recorded documents have their ESPN host swapped for this, and it's swapped for the mock's own address when served
+fixture_host = "http://espn.fixture"
+
+routes = [
+    ("list", re.compile(r"^/v3/sports/(?P<sport>[^/]+)/(?P<league>[^/]+)/athletes$")),
+    ("statisticslog", re.compile(r"^/v2/sports/(?P<sport>[^/]+)/leagues/(?P<league>[^/]+)/athletes/(?P<id>\d+)/statisticslog$")),
+    ("statistics", re.compile(r"^/v2/sports/(?P<sport>[^/]+)/leagues/(?P<league>[^/]+)/seasons/(?P<season>\d+)/types/\d+/athletes/(?P<id>\d+)/statistics$")),
+    ("college_athlete", re.compile(r"^/v2/sports/(?P<sport>[^/]+)/leagues/college-[^/]+/athletes/(?P<id>\d+)$")),
+    ("athlete", re.compile(r"^/v2/sports/(?P<sport>[^/]+)/leagues/(?P<league>[^/]+)/athletes/(?P<id>\d+)$")),
+    ("college", re.compile(r"^/v2/colleges/(?P<id>\d+)$")),
+    ("position", re.compile(r"^/v2/sports/(?P<sport>[^/]+)/leagues/(?P<league>[^/]+)/positions/(?P<id>\d+)$")),
+    ("team", re.compile(r"^/v2/sports/(?P<sport>[^/]+)/leagues/(?P<league>[^/]+)/seasons/\d+/teams/(?P<id>\d+)$")),
+]
+
+positions = ["QB", "RB", "WR", "TE", "OL", "DL", "LB", "CB", "S", "K"]
+
+# the stats each sport's season documents carry, by category, with a rough season high for each
+sport_stats = {
+    "football": {
+        "general": {"gamesPlayed": 17},
+        "passing": {"passingYards": 5000, "passingTouchdowns": 45, "interceptions": 20},
+        "rushing": {"rushingYards": 1800, "rushingTouchdowns": 18},
+        "receiving": {"receptions": 120, "receivingYards": 1700, "receivingTouchdowns": 16},
+        "defensive": {"totalTackles": 150, "sacks": 18},
+        "defensiveInterceptions": {"interceptions": 8},
+        "kicking": {"fieldGoalsMade": 40, "extraPointsMade": 55},
+    },
+    "basketball": {
+        "general": {"gamesPlayed": 82, "rebounds": 900},
+        "offensive": {"points": 2500, "assists": 700},
+    },
+    "baseball": {
+        "general": {"gamesPlayed": 162},
+        "batting": {"hits": 200, "homeRuns": 50, "RBIs": 130},
+        "pitching": {"wins": 20, "strikeouts": 300, "saves": 45},
+    },
+    "hockey": {
+        "general": {"gamesPlayed": 82},
+        "offensive": {"goals": 50, "assists": 70, "points": 120},
+        "goalKeeping": {"saves": 2000, "shutouts": 10},
+    },
+}
+
+
+class MockEspn:
+    '''
+    Synthetic ESPN universe: n_athletes athletes spread over n_colleges colleges and n_teams teams.
+    latency is added to every response in seconds. error_rate and throttle_rate are the share of
+    API requests answered with a 503 or a 429 (with Retry-After: retry_after) instead of the document.
+    fixtures is an optional directory of recorded documents that take precedence over generated ones.
+    '''
+
+    def __init__(self, n_athletes=1000, n_colleges=300, n_teams=32, latency=0.0, seed=0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=1, fixtures=None):
+        self.n_athletes = n_athletes
+        self.n_colleges = n_colleges
+        self.n_teams = n_teams
+        self.latency = latency
+        self.seed = seed
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fixtures = load_fixtures(fixtures) if fixtures else {}
+        self.base = ""
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._faults = random.Random(seed)
+
+    def record(self, route):
+        with self._lock:
+            self.calls[route] += 1
+
+    def fault(self):
+        # which injected failure, if any, this request gets
+        with self._lock:
+            x = self._faults.random()
+        if x < self.throttle_rate:
+            self.record("throttled")
+            return 429
+        if x < self.throttle_rate + self.error_rate:
+            self.record("error")
+            return 503
+        return None
+
+    def fixture(self, path):
+        text = self.fixtures.get(path.strip("/"))
+        return json.loads(text.replace(fixture_host, self.base)) if text is not None else None
+
+    def _rng(self, *key):
+        return random.Random(f"{self.seed}-" + "-".join(map(str, key)))
+
+    def athlete_ids(self):
+        return [str(1000 + i) for i in range(self.n_athletes)]
+
+    def list_page(self, sport, league, limit, page):
+        recorded = self.fixture(f"v3/sports/{sport}/{league}/athletes")
+        if recorded is not None:
+            # recorded lists are stored whole and paged here so any limit works
+            items = recorded["items"]
+            page_count = max(1, -(-len(items) // limit))
+            chunk = items[(page - 1) * limit:page * limit]
+            return {"count": len(items), "pageIndex": page, "pageSize": limit, "pageCount": page_count, "items": chunk}
+
+        ids = self.athlete_ids()
+        page_count = max(1, -(-len(ids) // limit))
+        chunk = ids[(page - 1) * limit:page * limit]
+        items = []
+        for aid in chunk:
+            rng = self._rng("athlete", aid)
+            items.append({
+                "id": aid,
+                "fullName": f"Player {aid}",
+                "firstName": "Player",
+                "lastName": aid,
+                "jersey": str(rng.randint(0, 99)),
+                "active": rng.random() < 0.4,
+                "weight": rng.randint(160, 330),
+                "height": rng.randint(66, 82),
+                "age": rng.randint(21, 40),
+                "dateOfBirth": f"{rng.randint(1985, 2004)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T07:00Z",
+                "experience": {"years": rng.randint(0, 15)},
+                "birthPlace": {"city": "Springfield", "state": "IL", "country": "USA"},
+            })
+        return {"count": len(ids), "pageIndex": page, "pageSize": limit, "pageCount": page_count, "items": items}
+
+    def athlete(self, sport, league, aid):
+        rng = self._rng("athlete", aid)
+        college_id = rng.randint(1, self.n_colleges)
+        doc = {
+            "id": aid,
+            "debutYear": rng.randint(2005, 2025),
+            "position": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/positions/{rng.randint(1, len(positions))}?lang=en&region=us"},
+            "team": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/2025/teams/{rng.randint(1, self.n_teams)}?lang=en&region=us"},
+            "college": {"$ref": f"{self.base}/v2/colleges/{college_id}?lang=en&region=us"},
+            "statisticslog": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/athletes/{aid}/statisticslog?lang=en&region=us"},
+        }
+        # most athletes resolve through collegeAthlete, some only have the direct college link
+        if rng.random() < 0.8:
+            doc["collegeAthlete"] = {"$ref": f"{self.base}/v2/sports/{sport}/leagues/college-{sport}/athletes/{aid}?lang=en&region=us"}
+        if rng.random() < 0.6:
+            doc["draft"] = {
+                "year": rng.randint(2005, 2025),
+                "round": rng.randint(1, 7),
+                "selection": rng.randint(1, 256),
+                "team": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/2025/teams/{rng.randint(1, self.n_teams)}?lang=en&region=us"},
+            }
+        return doc
+
+    def college_athlete(self, sport, aid):
+        college_id = self._rng("athlete", aid).randint(1, self.n_colleges)
+        return {
+            "id": aid,
+            "college": {"$ref": f"{self.base}/v2/colleges/{college_id}?lang=en&region=us"},
+            "statisticslog": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/college-{sport}/athletes/{aid}/statisticslog?lang=en&region=us"},
+        }
+
+    def statistics_log(self, sport, league, aid):
+        if not league.startswith("college-"):
+            return self.pro_statistics_log(sport, league, aid)
+
+        # two to five seasons ending at the athlete's college, about a quarter transferred in from another one
+        college_id = self._rng("athlete", aid).randint(1, self.n_colleges)
+        rng = self._rng("college-history", aid)
+        last = rng.randint(2005, 2024)
+        years = list(range(last - rng.randint(1, 4), last + 1))
+        moved = rng.randint(1, len(years) - 1) if rng.random() < 0.25 else 0
+        first_college = rng.randint(1, self.n_colleges)
+        entries = []
+        for i, year in enumerate(years):
+            team_id = first_college if i < moved else college_id
+            entries.append({
+                "season": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/{year}?lang=en&region=us"},
+                "statistics": [
+                    {"type": "total", "statistics": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/{year}/types/2/athletes/{aid}/statistics"}},
+                    {"type": "team", "team": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/{year}/teams/{team_id}?lang=en&region=us"}},
+                ],
+            })
+        return {"entries": entries}
+
+    def pro_statistics_log(self, sport, league, aid):
+        # a season from the debut year on for every year of experience, a few athletes never played a game
+        debut = self.athlete(sport, league, aid)["debutYear"]
+        rng = self._rng("pro-seasons", aid)
+        if rng.random() < 0.1:
+            return {"entries": []}
+        years = range(debut, min(debut + rng.randint(0, 12), 2025) + 1)
+        team_id = rng.randint(1, self.n_teams)
+        return {"entries": [{
+            "season": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/{year}?lang=en&region=us"},
+            "statistics": [
+                {"type": "total", "statistics": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/{year}/types/2/athletes/{aid}/statistics?lang=en&region=us"}},
+                {"type": "team", "team": {"$ref": f"{self.base}/v2/sports/{sport}/leagues/{league}/seasons/{year}/teams/{team_id}?lang=en&region=us"}},
+            ],
+        } for year in years]}
+
+    def statistics(self, sport, season, aid):
+        # a season's totals, every stat of the sport somewhere between nothing and a big year
+        rng = self._rng("statistics", aid, season)
+        return {"splits": {"categories": [
+            {"name": category, "stats": [{"name": name, "value": float(rng.randint(0, high))} for name, high in stats.items()]}
+            for category, stats in sport_stats.get(sport, {}).items()
+        ]}}
+
+    def college(self, cid):
+        return {"id": cid, "name": f"College {cid}", "abbrev": f"C{cid}"}
+
+    def position(self, pid):
+        return {"id": pid, "abbreviation": positions[int(pid) - 1], "name": positions[int(pid) - 1]}
+
+    def team(self, tid):
+        return {"id": tid, "abbreviation": f"T{int(tid):02d}"}
+
+    def has_image(self, img):
+        # about one in five synthetic athletes has no headshot, league logos always exist
+        self.record("image")
+        match = re.search(r"/players/full/(\d+)\.png$", img or "")
+        if match:
+            return self._rng("headshot", match.group(1)).random() >= 0.2
+        return bool(img)
+
+    def resolve(self, path, query):
+        for name, pattern in routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            args = match.groupdict()
+            self.record(name)
+            if name != "list":
+                recorded = self.fixture(path)
+                if recorded is not None:
+                    return recorded
+            if name == "list":
+                limit = int(query.get("limit", ["1000"])[0])
+                page = int(query.get("page", ["1"])[0])
+                return self.list_page(args["sport"], args["league"], limit, page)
+            if name == "athlete":
+                if int(args["id"]) - 1000 >= self.n_athletes:
+                    return None
+                return self.athlete(args["sport"], args["league"], args["id"])
+            if name == "statisticslog":
+                if int(args["id"]) - 1000 >= self.n_athletes:
+                    return None
+                return self.statistics_log(args["sport"], args["league"], args["id"])
+            if name == "statistics":
+                return self.statistics(args["sport"], args["season"], args["id"])
+            if name == "college_athlete":
+                return self.college_athlete(args["sport"], args["id"])
+            if name == "college":
+                return self.college(args["id"])
+            if name == "position":
+                return self.position(args["id"])
+            if name == "team":
+                return self.team(args["id"])
+        self.record("unknown")
+        return None
+
+
+def load_fixtures(directory):
+    '''
+    Recorded documents keyed by url path, ie. fixtures/v2/colleges/41.json serves /v2/colleges/41.
+    Kept as text so fixture_host can be swapped for whatever address the mock ends up on.
+    '''
+
+    directory = Path(directory)
+    return {
+        path.relative_to(directory).with_suffix("").as_posix(): path.read_text()
+        for path in directory.rglob("*.json")
+    }
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_HEAD(self):
+            self.do_GET(head=True)
+
+        def do_GET(self, head=False):
+            if mock.latency:
+                sleep(mock.latency)
+            url = urlparse(self.path)
+            if url.path == "/combiner/i":
+                found = mock.has_image(parse_qs(url.query).get("img", [""])[0])
+                body = b"" if head or not found else b"\x89PNG\r\n\x1a\n"
+                self.send_response(200 if found else 404)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            status = mock.fault()
+            if status:
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", str(mock.retry_after))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            doc = mock.resolve(url.path, parse_qs(url.query))
+            if doc is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = json.dumps(doc).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(mock, host="127.0.0.1", port=0):
+    '''
+    Starts the stand-in server on a background thread and returns it.
+    $ref links in every document point back at this server.
+    '''
+
+    server = ThreadingHTTPServer((host, port), make_handler(mock))
+    server.daemon_threads = True
+    mock.base = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the ESPN core API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--athletes", type=int, default=1000, help="synthetic athletes per league")
+    parser.add_argument("--colleges", type=int, default=300)
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--fixtures", type=Path, help="directory of recorded documents to serve before synthetic ones")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mock = MockEspn(
+        n_athletes=args.athletes, n_colleges=args.colleges, n_teams=args.teams, latency=args.latency,
+        seed=args.seed, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after, fixtures=args.fixtures,
+    )
+    server = serve(mock, port=args.port)
+    print(f"Mock ESPN API listening on {mock.base} ({len(mock.fixtures)} recorded documents)")
+    print(f"Point the scraper at it with --base-url {mock.base} or ESPN_API_BASE={mock.base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# per-season player statistics as get_espn_api_player_statistics.py stores them:
+# one row per athlete, season and stat, in a parquet file per league under <directory>/league=<league>/
+statistics_schema = pa.schema([
+    ("id", pa.int64()),
+    ("season", pa.int16()),
+    ("category", pa.string()),
+    ("stat", pa.string()),
+    ("value", pa.float64()),
+])
+
+# the stats worth a hint per league and kind of player, as (category, stat, label)
+# a group's first stat is the one its best season is picked on
+hint_stats = {
+    "nfl": {
+        "passing": [("passing", "passingYards", "passing yards"), ("passing", "passingTouchdowns", "passing TDs"),
+                    ("passing", "interceptions", "interceptions")],
+        "rushing": [("rushing", "rushingYards", "rushing yards"), ("rushing", "rushingTouchdowns", "rushing TDs"),
+                    ("receiving", "receptions", "receptions")],
+        "receiving": [("receiving", "receivingYards", "receiving yards"), ("receiving", "receptions", "receptions"),
+                      ("receiving", "receivingTouchdowns", "receiving TDs")],
+        "kicking": [("kicking", "fieldGoalsMade", "field goals"), ("kicking", "extraPointsMade", "extra points")],
+        "defense": [("defensive", "totalTackles", "tackles"), ("defensive", "sacks", "sacks"),
+                    ("defensiveInterceptions", "interceptions", "interceptions")],
+    },
+    "nba": {
+        "all": [("offensive", "points", "points"), ("general", "rebounds", "rebounds"), ("offensive", "assists", "assists")],
+    },
+    "mlb": {
+        "pitching": [("pitching", "strikeouts", "strikeouts"), ("pitching", "wins", "wins"), ("pitching", "saves", "saves")],
+        "batting": [("batting", "hits", "hits"), ("batting", "homeRuns", "home runs"), ("batting", "RBIs", "RBIs")],
+    },
+    "nhl": {
+        "goalie": [("goalKeeping", "saves", "saves"), ("goalKeeping", "shutouts", "shutouts")],
+        "skater": [("offensive", "points", "points"), ("offensive", "goals", "goals"), ("offensive", "assists", "assists")],
+    },
+}
+
+position_groups = {
+    "nfl": {"QB": "passing", "RB": "rushing", "FB": "rushing", "WR": "receiving", "TE": "receiving", "K": "kicking", "PK": "kicking"},
+    "nba": {},
+    "mlb": {"SP": "pitching", "RP": "pitching", "P": "pitching"},
+    "nhl": {"G": "goalie"},
+}
+
+default_groups = {"nfl": "defense", "nba": "all", "mlb": "batting", "nhl": "skater"}
+
+# career numbers read better per game in these leagues
+per_game_leagues = {"nba"}
+
+games_played = ("general", "gamesPlayed")
+
+
+def partition_path(directory, league):
+    return directory / f"league={league}" / "part-0.parquet"
+
+
+def wanted_stats(league):
+    pairs = {games_played} | {(category, stat) for group in hint_stats[league].values() for category, stat, _ in group}
+    return pd.DataFrame(sorted(pairs), columns=["category", "stat"])
+
+
+def career_totals(directory, league, players, batch_size=1 << 16):
+    '''
+    One row of career total, seasons and best season per (id, league, category, stat) for the hint stats of players,
+    streamed over the league's statistics partition. Each record batch is joined to the players on (id, league)
+    and folded into fixed size accumulators straight away, so memory is one batch plus a slot per player and stat
+    however many seasons are stored.
+    '''
+
+    wanted = wanted_stats(league)
+    stat_index = pd.MultiIndex.from_frame(wanted)
+    ids = pd.to_numeric(players.loc[players["league"] == league, "id"], errors="coerce").dropna()
+    player_index = pd.Index(ids.astype("int64").unique())
+    slots = len(player_index) * len(stat_index)
+    total = np.zeros(slots)
+    seasons = np.zeros(slots, dtype=np.int64)
+    best = np.full(slots, -np.inf)
+    best_season = np.zeros(slots, dtype=np.int16)
+
+    # category and stat come back dictionary encoded, so a batch never turns them into python strings
+    parquet = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns={"category", "stat"}))
+    # only the finished part files, never a scrape's temp file
+    files = [str(path) for path in sorted(directory.glob("league=*/part-*.parquet"))]
+    dataset = ds.dataset(files, format=parquet, partitioning="hive", partition_base_dir=str(directory))
+    scanner = dataset.scanner(
+        columns=["id", "season", "category", "stat", "value"],
+        filter=(ds.field("league") == league) & ds.field("stat").isin(wanted["stat"].unique().tolist()),
+        batch_size=batch_size,
+        batch_readahead=2,
+        fragment_readahead=1,
+    )
+    for batch in scanner.to_batches():
+        chunk = batch.to_pandas()
+        player = player_index.get_indexer(chunk["id"])
+        stat = stat_index.get_indexer(pd.MultiIndex.from_arrays([chunk["category"], chunk["stat"]]))
+        joined = (player >= 0) & (stat >= 0)
+        if not joined.any():
+            continue
+        slot = player[joined] * len(stat_index) + stat[joined]
+        value = chunk["value"].to_numpy()[joined]
+        season = chunk["season"].to_numpy()[joined]
+
+        total += np.bincount(slot, weights=value, minlength=slots)
+        seasons += np.bincount(slot, minlength=slots)
+        # the batch's best season per slot is the last one after sorting by slot then value
+        order = np.lexsort((value, slot))
+        slot, value, season = slot[order], value[order], season[order]
+        last = np.append(slot[1:] != slot[:-1], True)
+        better = value[last] > best[slot[last]]
+        best[slot[last][better]] = value[last][better]
+        best_season[slot[last][better]] = season[last][better]
+
+    found = np.flatnonzero(seasons)
+    player, stat = np.divmod(found, len(stat_index))
+    return pd.DataFrame({
+        "id": player_index[player],
+        "league": league,
+        "category": wanted["category"].to_numpy()[stat],
+        "stat": wanted["stat"].to_numpy()[stat],
+        "total": total[found],
+        "seasons": seasons[found],
+        "best": best[found],
+        "best_season": best_season[found],
+    })
+
+
+def number(value):
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.1f}"
+
+
+def hint_lines(position, totals, league):
+    '''
+    Up to three lines about one player's career: seasons and games, career numbers for their position's
+    stats, and their best season. totals is the player's {(category, stat): career_totals row}.
+    None when there's nothing to say.
+    '''
+
+    stats = hint_stats[league][position_groups[league].get(position, default_groups[league])]
+    games = totals.get(games_played)
+    lines = []
+    if games and games["total"]:
+        seasons = int(games["seasons"])
+        lines.append(f"{seasons} {league.upper()} season{'s' if seasons != 1 else ''}, {number(games['total'])} games")
+
+    per_game = league in per_game_leagues and games and games["total"]
+    career = []
+    for category, stat, label in stats:
+        found = totals.get((category, stat))
+        if found and found["total"]:
+            career.append(f"{found['total'] / games['total']:.1f} {label}" if per_game else f"{number(found['total'])} {label}")
+    if career:
+        lines.append("Career: " + ", ".join(career) + (" per game" if per_game else ""))
+
+    category, stat, label = stats[0]
+    found = totals.get((category, stat))
+    if found and found["best"] and found["seasons"] > 1:
+        lines.append(f"Best season: {int(found['best_season'])}, {number(found['best'])} {label}")
+    return "\n".join(lines) or None
+
+
+def attach_hints(df, directory, league):
+    '''
+    Adds statHints, the precomputed hint text the app shows under a player, from the league's statistics.
+    Players without statistics (or leagues that haven't been pulled) get None.
+    '''
+
+    df = df.copy()
+    df["statHints"] = None
+    if not partition_path(directory, league).exists():
+        return df
+
+    by_player = {}
+    for row in career_totals(directory, league, df).to_dict("records"):
+        by_player.setdefault(int(row["id"]), {})[(row["category"], row["stat"])] = row
+    ids = pd.to_numeric(df["id"], errors="coerce")
+    df["statHints"] = [
+        hint_lines(position, by_player[int(pid)], league) if pd.notna(pid) and int(pid) in by_player else None
+        for pid, position in zip(ids, df["position"])
+    ]
+    return df
@@ -1,35 +1,292 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 from pathlib import Path
-import requests
 
 script_directory = Path(__file__).resolve().parent
+sys.path.insert(0, str(script_directory.parent))
+
+from wdtb.schema import to_app_frame
+import player_stats
+import reconcile
+import validation
+
 data_directory = script_directory.parent / "data"
 espn_directory = data_directory / "espn" / "player_profiles"
+statistics_directory = data_directory / "espn" / "statistics"
 app_directory = data_directory / "app_data"
+partition_directory = app_directory / "partitions"
 accepted_answers_directory = data_directory / "manual"
+sleeper_directory = data_directory / "sleeper"
+inspection_directory = data_directory / "inspection"
+reconciliation_directory = inspection_directory / "reconciliation"
+manifest_path = partition_directory / "manifest.json"
 
-player_stats = pd.read_csv("../data/espn/statistics/espn_api_player_statistics.csv")
+# inputs besides the league's own profile csv. a change to any of them rebuilds the partition
+shared_inputs = {
+    "accepted_answers": accepted_answers_directory / "accepted_answers.csv",
+    "overrides": accepted_answers_directory / "manual_overrides.csv",
+}
 
 leagues = ['nfl', 'nhl', 'nba', 'mlb']
-dfs = []
-
-for league in leagues:
-    file_path = espn_directory / f"{league}_espn_api_player_profiles.csv"
-    df = pd.read_csv(file_path)
-    dfs.append(df)
-
-player_college_data = pd.concat(dfs)
-
-# filter out players with no college
-# filter to just most recent pull of each player
-# filter out players with no position
-# filter out players with no experience
-player_college_data = player_college_data[player_college_data['college'].notna()]
-player_college_data = player_college_data[player_college_data['is_latest'] == 1]
-player_college_data = player_college_data[player_college_data['position'] != '-']
-player_college_data = player_college_data[player_college_data['experience_years'].notna()]
-# player_college_data = player_college_data.merge(player_stats, left_on="id", right_on="athlete_id", how="left")
-# need to join on athlete id and sport ^
-
-output_path = app_directory / "player_profile_data.csv"
-player_college_data.to_csv(output_path, index=False)
\ No newline at end of file
+
+# bump whenever the filters or columns below change so every partition gets rebuilt
+pipeline_version = 4
+
+# only the profile columns anything downstream uses, with explicit types so nothing gets inferred
+source_columns = {
+    "uuid": pa.string(),
+    "id": pa.int64(),
+    "league": pa.string(),
+    "fullName": pa.string(),
+    "position": pa.string(),
+    "team": pa.string(),
+    "active": pa.bool_(),
+    "experience_years": pa.float64(),
+    "debutYear": pa.float64(),
+    "college": pa.string(),
+    "collegeId": pa.float64(),
+    "college_source": pa.string(),
+    "college_history": pa.string(),
+    "draftYear": pa.float64(),
+    "draftRound": pa.float64(),
+    "draftPick": pa.float64(),
+    "processed_ts": pa.string(),
+    "is_latest": pa.int8(),
+}
+
+output_columns = [c for c in source_columns if c != "is_latest"]
+
+
+def fingerprint(path, previous=None):
+    '''
+    mtime, size and sha256 of a file. The hash is only recomputed when mtime or size moved,
+    so an untouched input costs a stat call.
+    '''
+
+    stat = path.stat()
+    if previous and previous.get("mtime") == stat.st_mtime and previous.get("size") == stat.st_size:
+        return dict(previous)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest.hexdigest(), "version": pipeline_version}
+
+
+def read_league(file_path):
+    '''
+    Reads one league's SCD profile csv, keeping only the needed columns and rows.
+    The filters run inside the scan so history rows (is_latest == 0) are never materialized.
+    Players without a college are kept here, reconciliation may still find one for them.
+    '''
+
+    header = pacsv.open_csv(file_path).schema.names
+    columns = [c for c in source_columns if c in header]
+    csv_format = ds.CsvFileFormat(
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: source_columns[c] for c in columns},
+            strings_can_be_null=True,
+        )
+    )
+
+    # filter to just most recent pull of each player
+    # filter out players with no position
+    # filter out players with no experience
+    row_filter = (
+        (ds.field("is_latest") == 1)
+        & ((ds.field("position") != "-") | ds.field("position").is_null())
+        & ds.field("experience_years").is_valid()
+    )
+    table = ds.dataset(file_path, format=csv_format).to_table(columns=columns, filter=row_filter)
+    df = table.to_pandas()
+    for col in output_columns:
+        if col not in df.columns:
+            df[col] = None
+    return df[output_columns]
+
+
+def reconcile_league(df, league, lookup, overrides, accepted_ids):
+    '''
+    Fills and corrects colleges from Sleeper and the manual overrides, writes the league's report
+    and drops players that still have no college.
+    '''
+
+    sleeper = reconcile.read_sleeper(sleeper_directory / f"{league}_players.csv", league)
+    df, report = reconcile.reconcile(df, sleeper, overrides, lookup, accepted_ids)
+
+    reconciliation_directory.mkdir(parents=True, exist_ok=True)
+    write_atomic(report, reconciliation_directory / f"{league}.csv", lambda d, p: d.to_csv(p, index=False))
+    counts = report["resolution"].value_counts()
+    unmatched = counts.get("sleeper_college_unmatched", 0) + counts.get("override_unmatched", 0)
+    print(f"{league}: {counts.get('filled_from_sleeper', 0)} colleges filled from Sleeper, "
+          f"{counts.get('manual_override', 0)} manual overrides, {counts.get('disagreement', 0)} disagreements, "
+          f"{unmatched} names with no accepted answer, "
+          f"{int(df['collegeIds'].str.contains(';').sum())} players accepted at more than one college")
+
+    return drop_missing_college(df)
+
+
+def drop_missing_college(df):
+    # filter out players with no college
+    has_college = df["college"].notna() & (df["college"].astype("string").str.strip() != "")
+    return df[has_college.astype(bool)].reset_index(drop=True)
+
+
+def write_atomic(df, path, writer):
+    # write next to the target and swap it in so the app never reads a half written file
+    tmp_path = path.with_name(path.name + ".tmp")
+    writer(df, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def build_partitions(force=False):
+    '''
+    Rebuilds the per-league partitions whose source csv changed since the last run.
+    Returns the leagues that were rebuilt and the updated manifest. A league is dropped from the saved manifest
+    before its partition is replaced, and the updated one is only saved once the build passed validation,
+    so a blocked or interrupted run gets rebuilt and validated again next time.
+    '''
+
+    partition_directory.mkdir(parents=True, exist_ok=True)
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    saved = dict(manifest)
+    rebuilt = []
+    lookup, overrides, accepted_ids = None, None, None
+
+    for league in leagues:
+        file_path = espn_directory / f"{league}_espn_api_player_profiles.csv"
+        partition_path = partition_directory / f"{league}.parquet"
+        previous = manifest.get(league)
+
+        if not file_path.exists():
+            if partition_path.exists():
+                print(f"{league}: no source file, keeping existing partition")
+            else:
+                # leagues we only have in the app data so far (ie. mlb) get seeded from it
+                seed = bootstrap_partition(league)
+                if seed is not None:
+                    write_atomic(seed, partition_path, lambda d, p: d.to_parquet(p, index=False))
+                    print(f"{league}: no source file, seeded partition from existing app data ({len(seed)} players)")
+                else:
+                    print(f"{league}: no source file, skipping")
+            continue
+
+        current = fingerprint(file_path, previous)
+        inputs = dict(shared_inputs, sleeper=sleeper_directory / f"{league}_players.csv",
+                      statistics=player_stats.partition_path(statistics_directory, league))
+        previous_inputs = (previous or {}).get("inputs", {})
+        current["inputs"] = {
+            name: fingerprint(path, previous_inputs.get(name)) for name, path in inputs.items() if path.exists()
+        }
+        unchanged = (
+            previous is not None
+            and previous.get("sha256") == current["sha256"]
+            and previous.get("version") == pipeline_version
+            and {k: v["sha256"] for k, v in previous_inputs.items()} == {k: v["sha256"] for k, v in current["inputs"].items()}
+            and partition_path.exists()
+        )
+        if unchanged and not force:
+            print(f"{league}: unchanged, skipping")
+            manifest[league] = current
+            continue
+
+        if lookup is None:
+            accepted_answers = pd.read_csv(shared_inputs["accepted_answers"], encoding="utf-8-sig")
+            lookup = reconcile.college_lookup(accepted_answers)
+            accepted_ids = accepted_answers["collegeId"]
+            overrides = reconcile.read_overrides(shared_inputs["overrides"])
+        df = reconcile_league(read_league(file_path), league, lookup, overrides, accepted_ids)
+        df = player_stats.attach_hints(df, statistics_directory, league)
+        print(f"{league}: stat hints for {int(df['statHints'].notna().sum())} of {len(df)} players")
+        if saved.pop(league, None) is not None:
+            save_manifest(saved)
+        write_atomic(df, partition_path, lambda d, p: d.to_parquet(p, index=False))
+        current["version"] = pipeline_version
+        manifest[league] = current
+        rebuilt.append(league)
+        print(f"{league}: rebuilt partition ({len(df)} players)")
+
+    return rebuilt, manifest
+
+
+def save_manifest(manifest):
+    write_atomic(manifest, manifest_path, lambda m, p: p.write_text(json.dumps(m, indent=2)))
+
+
+def bootstrap_partition(league):
+    app_csv = app_directory / "player_profile_data.csv"
+    if not app_csv.exists():
+        return None
+    df = pd.read_csv(app_csv)
+    df = df[df["league"] == league]
+    if df.empty:
+        return None
+    for col in output_columns + ["collegeIds", "statHints"]:
+        if col not in df.columns:
+            df[col] = None
+    return df[output_columns + ["collegeIds", "statHints"]]
+
+
+def validate(players):
+    '''
+    Runs the validation checks, writes the timestamped inspection report and prints a summary.
+    Returns False if anything blocking was found.
+    '''
+
+    accepted_answers = pd.read_csv(shared_inputs["accepted_answers"], encoding="utf-8-sig")
+    issues = validation.validate(players, accepted_answers)
+
+    inspection_directory.mkdir(parents=True, exist_ok=True)
+    report_path = inspection_directory / f"validation_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.csv"
+    issues.to_csv(report_path, index=False)
+
+    counts = issues.groupby(["severity", "check"]).size()
+    for (severity, check), n in counts.items():
+        print(f"{severity}: {check} ({n})")
+    blocking = int(counts.get("blocking", pd.Series(dtype=int)).sum())
+    print(f"Validation {'failed' if blocking else 'passed'}, report written to {report_path.relative_to(data_directory)}")
+    return blocking == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the app dataset from the ESPN profile pulls")
+    parser.add_argument("--force", action="store_true", help="rebuild every league partition")
+    args = parser.parse_args()
+
+    rebuilt, manifest = build_partitions(args.force)
+    artifact_path = app_directory / "player_profile_data.parquet"
+    output_path = app_directory / "player_profile_data.csv"
+    if not rebuilt and artifact_path.exists() and output_path.exists():
+        save_manifest(manifest)
+        print("No league changed, app data is up to date")
+        return
+
+    # stitching the partitions back together is cheap, it's the per-league csv parsing we avoid
+    partitions = [partition_directory / f"{league}.parquet" for league in leagues]
+    player_college_data = pd.concat(
+        [pd.read_parquet(p) for p in partitions if p.exists()], ignore_index=True
+    )
+    # statistics were already joined per league on (id, league), see player_stats.attach_hints
+
+    # nothing is written unless every player can be graded by the app
+    if not validate(player_college_data):
+        raise SystemExit("Validation failed, app data was not updated")
+
+    write_atomic(player_college_data, output_path, lambda d, p: d.to_csv(p, index=False))
+
+    # typed columnar copy of just the columns the app uses. the app loads this and only falls back to the csv
+    write_atomic(to_app_frame(player_college_data), artifact_path, lambda d, p: d.to_parquet(p, index=False))
+    save_manifest(manifest)
+    print(f"Wrote {len(player_college_data)} players to {output_path.name} and {artifact_path.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import random
+import threading
+from bisect import bisect_left
+from collections import Counter, deque
+from time import monotonic, sleep
+
+
+class AdaptiveRate:
+    '''
+    Token bucket shared by every thread talking to ESPN.
+    The refill rate doubles every second's worth of healthy responses until the server first pushes back,
+    then backs off multiplicatively when it's overloaded and grows by a share of itself while responses stay
+    healthy, so a run settles near the fastest rate the server will sustain instead of a hand tuned sleep.
+    Overload is judged over the last window responses: more than throttle_threshold of them 429s, or more than
+    error_threshold 5xx/timeouts. An isolated failure is left to the request's own retry backoff, and Retry-After
+    is waited out by the thread that got it. The whole bucket only pauses for a burst of 429s.
+    '''
+
+    def __init__(self, rate=50.0, min_rate=1.0, max_rate=500.0, burst=16, increase=0.1, decrease=0.7, cooldown=1.0,
+                 window=100, throttle_threshold=0.05, error_threshold=0.1):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.throttle_threshold = throttle_threshold
+        self.error_threshold = error_threshold
+        self._last_decrease = float("-inf")
+        self._slow_start = True
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._paused_until = 0.0
+        # recent outcomes, None for healthy, "throttled" or "error"
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            sleep(wait)
+
+    def success(self):
+        # +1 per response doubles the rate each second in slow start. after that each response adds
+        # increase, ie. about +increase * rate req/s per second (at least +1), so a cut is made up in seconds
+        with self._lock:
+            self._outcomes.append(None)
+            step = 1.0 if self._slow_start else max(self.increase, 1.0 / max(self.rate, 1.0))
+            self.rate = min(self.max_rate, self.rate + step)
+
+    def error(self):
+        # a 5xx, timeout or broken body
+        with self._lock:
+            self._outcomes.append("error")
+            if self._overloaded("error", self.error_threshold):
+                self._decrease(monotonic())
+
+    def throttled(self, retry_after=None):
+        # a 429. the caller waits out its own Retry-After, a burst of them pauses everyone
+        with self._lock:
+            self._outcomes.append("throttled")
+            if self._overloaded("throttled", self.throttle_threshold):
+                now = monotonic()
+                self._decrease(now)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _overloaded(self, kind, threshold):
+        # needs half a window to judge, and starts over once it has acted
+        if len(self._outcomes) < self._outcomes.maxlen // 2:
+            return False
+        if self._outcomes.count(kind) / len(self._outcomes) <= threshold:
+            return False
+        self._outcomes.clear()
+        return True
+
+    def _decrease(self, now):
+        self._slow_start = False
+        # every request in flight sees the same overload, so it only counts once per cooldown
+        if now - self._last_decrease >= self.cooldown:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_decrease = now
+
+
+def backoff(attempt, base=0.5, cap=30.0):
+    # full jitter, so threads that failed together don't retry together
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class FetchStats:
+    '''
+    Counters for one scrape: requests, retries, failures by kind, genuinely missing documents
+    (404s, which aren't errors) and a latency histogram. Cache hits never reach here.
+    '''
+
+    # upper edges of the latency buckets in ms, the last bucket is everything slower
+    buckets_ms = [25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self, window=10.0):
+        self.window = window
+        self.requests = 0
+        self.retries = 0
+        self.missing = 0
+        self.failed = 0
+        self.errors = Counter()
+        self.histogram = [0] * (len(self.buckets_ms) + 1)
+        self._recent = deque()
+        self._started = monotonic()
+        self._lock = threading.Lock()
+
+    def request(self, seconds):
+        with self._lock:
+            now = monotonic()
+            self.requests += 1
+            self.histogram[bisect_left(self.buckets_ms, seconds * 1000)] += 1
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - self.window:
+                self._recent.popleft()
+
+    def error(self, kind, retrying):
+        with self._lock:
+            self.errors[kind] += 1
+            if retrying:
+                self.retries += 1
+            else:
+                self.failed += 1
+
+    def miss(self):
+        with self._lock:
+            self.missing += 1
+
+    def rate(self):
+        # requests/sec over the last window seconds
+        with self._lock:
+            elapsed = min(self.window, monotonic() - self._started)
+            return len(self._recent) / elapsed if elapsed > 0 else 0.0
+
+    def percentile(self, q):
+        # upper edge of the bucket holding the q-th percentile, close enough for a progress line
+        with self._lock:
+            total = sum(self.histogram)
+            if not total:
+                return None
+            seen = 0
+            for edge, count in zip(self.buckets_ms + [None], self.histogram):
+                seen += count
+                if seen >= total * q:
+                    return edge
+
+    def progress(self):
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        latency = f"p50 <{p50}ms p95 <{p95}ms" if p95 else f"p50 <{p50}ms p95 >{self.buckets_ms[-1]}ms"
+        return f"{self.rate():.1f} req/s, {latency}, {self.retries} retries, {self.failed} failed"
+
+    def summary(self):
+        elapsed = monotonic() - self._started
+        lines = [
+            f"ESPN requests: {self.requests} in {elapsed / 60:.1f} minutes ({self.requests / max(elapsed, 1e-9):.1f} req/s), "
+            f"{self.retries} retries, {self.failed} failed, {self.missing} missing (404)"
+        ]
+        if self.errors:
+            lines.append("  errors: " + ", ".join(f"{kind} {count}" for kind, count in self.errors.most_common()))
+        lower = 0
+        for edge, count in zip(self.buckets_ms + [None], self.histogram):
+            label = f"{lower}-{edge}ms" if edge else f">{lower}ms"
+            lines.append(f"  {label:>12}: {count}")
+            lower = edge
+        return lines
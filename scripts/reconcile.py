@@ -0,0 +1,155 @@
+import pandas as pd
+
+from wdtb.answers import alias_table, normalize_series
+
+# ESPN <-> Sleeper college reconciliation, run on each league partition during preprocessing
+# everything here is a merge or a column op, nothing loops over players
+
+# what Sleeper puts in college for players who didn't play in college
+no_college = ["no college", "none", "n a"]
+
+report_columns = [
+    "uuid", "id", "league", "fullName", "espn_college", "espn_collegeId",
+    "sleeper_college", "sleeper_collegeId", "college", "collegeId", "resolution",
+]
+
+
+def college_lookup(accepted_answers):
+    '''
+    Normalized alias -> collegeId from the accepted answers. Aliases shared by more than one college
+    are dropped since they can't say which college a name means.
+    '''
+
+    aliases = alias_table(accepted_answers)
+    aliases = aliases[~aliases["key"].duplicated(keep=False)]
+    return aliases.set_index("key")["collegeId"].astype("float64")
+
+
+def resolve_ids(names, lookup):
+    '''
+    collegeId for each college name, or NaN. Names that don't match an alias are retried without a
+    leading "University of" / "The", which is how most of the spelled out Sleeper and override names differ.
+    '''
+
+    keys = normalize_series(names)
+    ids = pd.Series(lookup.reindex(keys).to_numpy(), index=names.index)
+    stripped = keys.str.replace(r"^(the |univ of )", "", regex=True)
+    return ids.fillna(pd.Series(lookup.reindex(stripped).to_numpy(), index=names.index))
+
+
+def read_sleeper(path, league):
+    if not path.exists():
+        return pd.DataFrame(columns=["id", "league", "sleeper_college"])
+    sleeper = pd.read_csv(path, usecols=["espn_id", "college"], dtype={"espn_id": "float64", "college": "string"})
+    sleeper = sleeper.dropna(subset=["espn_id"]).rename(columns={"espn_id": "id", "college": "sleeper_college"})
+    sleeper["id"] = sleeper["id"].astype("int64")
+    sleeper["sleeper_college"] = sleeper["sleeper_college"].str.replace("&amp;", "&", regex=False)
+    sleeper["league"] = league
+    return sleeper.drop_duplicates(subset=["id", "league"])
+
+
+def read_overrides(path):
+    '''
+    manual_overrides.csv: id, fullName, pref_college. pref_college can list several schools separated by ';',
+    the first one is the one we show and the rest (override_also) are accepted too.
+    '''
+
+    if not path.exists():
+        return pd.DataFrame(columns=["id", "override_name", "override_college", "override_also"])
+    overrides = pd.read_csv(path, dtype={"id": "int64", "fullName": "string", "pref_college": "string"})
+    schools = overrides["pref_college"].str.split(";")
+    return pd.DataFrame({
+        "id": overrides["id"],
+        "override_name": overrides["fullName"],
+        "override_college": schools.str[0].str.strip(),
+        "override_also": schools.str[1:].str.join(";").replace("", pd.NA),
+    }).drop_duplicates(subset=["id"], keep="last")
+
+
+def college_sets(profiles, also, accepted_ids):
+    '''
+    Every college id a player can be answered with, as "id;id" text with the shown collegeId first, then
+    the colleges of the ESPN college history in the order they were attended, then also (extra ids per row).
+    Ids that aren't accepted answers are left out, nobody could type them.
+    '''
+
+    history = profiles["college_history"].astype("string").str.findall(r"(?:^|;)(\d+)").explode()
+    parts = pd.concat([
+        pd.DataFrame({"rank": 0, "collegeId": pd.to_numeric(profiles["collegeId"], errors="coerce")}),
+        pd.DataFrame({"rank": 1, "collegeId": pd.to_numeric(history, errors="coerce")}),
+        pd.DataFrame({"rank": 2, "collegeId": pd.to_numeric(also, errors="coerce")}),
+    ]).rename_axis("row").reset_index()
+    parts = parts[parts["collegeId"].isin(accepted_ids)]
+    parts = parts.sort_values(["row", "rank"], kind="stable").drop_duplicates(subset=["row", "collegeId"])
+    joined = parts["collegeId"].astype("int64").astype(str).groupby(parts["row"]).agg(";".join)
+    return joined.reindex(profiles.index).astype("string")
+
+
+def reconcile(profiles, sleeper, overrides, lookup, accepted_ids):
+    '''
+    Joins Sleeper onto ESPN profiles on (id, league), fills colleges ESPN doesn't have from Sleeper and
+    applies manual overrides on top. Fills and overrides only happen when the college resolves to an
+    accepted answer id, otherwise the player couldn't be answered and it's reported as unmatched instead.
+    Also sets collegeIds, every college the player can be answered with (see college_sets).
+    Returns the updated profiles and a report of every fill, override, disagreement and unmatched name.
+    '''
+
+    espn_college, espn_college_id = profiles["college"].copy(), profiles["collegeId"].copy()
+    joined = profiles.merge(sleeper, on=["id", "league"], how="left", validate="many_to_one")
+    # the merge keeps the left order, so joined lines up row for row with profiles
+    joined.index = profiles.index
+
+    sleeper_key = normalize_series(joined["sleeper_college"])
+    joined["sleeper_collegeId"] = resolve_ids(joined["sleeper_college"], lookup)
+
+    has_espn = espn_college.notna() & (espn_college.astype("string").str.strip() != "")
+    has_sleeper = sleeper_key.notna() & (sleeper_key != "") & ~sleeper_key.isin(no_college)
+    same_id = joined["sleeper_collegeId"] == espn_college_id
+    same_name = sleeper_key == normalize_series(espn_college)
+    disagree = (has_espn & has_sleeper & ~(same_id.fillna(False) | same_name.fillna(False))).astype(bool)
+
+    fill = (~has_espn & has_sleeper & joined["sleeper_collegeId"].notna()).astype(bool)
+    fill_unmatched = (~has_espn & has_sleeper & joined["sleeper_collegeId"].isna()).astype(bool)
+    profiles.loc[fill, "college"] = joined.loc[fill, "sleeper_college"]
+    profiles.loc[fill, "collegeId"] = joined.loc[fill, "sleeper_collegeId"]
+    profiles.loc[fill, "college_source"] = "sleeper"
+
+    # overrides only apply when the name matches too, ids aren't unique across leagues
+    matched = profiles[["id", "fullName"]].merge(overrides, on="id", how="left")
+    matched.index = profiles.index
+    name_ok = matched["override_name"].isna() | (
+        normalize_series(matched["override_name"]) == normalize_series(matched["fullName"])
+    ).fillna(False)
+    override_id = resolve_ids(matched["override_college"], lookup)
+    wanted = (matched["override_college"].notna() & name_ok).astype(bool)
+    override = (wanted & override_id.notna()).astype(bool)
+    profiles.loc[override, "college"] = matched.loc[override, "override_college"]
+    profiles.loc[override, "collegeId"] = override_id[override]
+    profiles.loc[override, "college_source"] = "manual"
+
+    # the other schools of a multi school override, ie. "Stephen F. Austin;UAB"
+    also = matched.loc[override, "override_also"].dropna().str.split(";").explode().str.strip()
+    profiles["collegeIds"] = college_sets(profiles, resolve_ids(also, lookup), accepted_ids)
+
+    resolution = pd.Series(pd.NA, index=profiles.index, dtype="string")
+    resolution[disagree] = "disagreement"
+    resolution[fill] = "filled_from_sleeper"
+    resolution[fill_unmatched] = "sleeper_college_unmatched"
+    resolution[override] = "manual_override"
+    resolution[wanted & ~override] = "override_unmatched"
+    flagged = resolution.notna()
+
+    report = pd.DataFrame({
+        "uuid": profiles["uuid"],
+        "id": profiles["id"],
+        "league": profiles["league"],
+        "fullName": profiles["fullName"],
+        "espn_college": espn_college,
+        "espn_collegeId": espn_college_id,
+        "sleeper_college": joined["sleeper_college"],
+        "sleeper_collegeId": joined["sleeper_collegeId"],
+        "college": profiles["college"].where(~(wanted & ~override), matched["override_college"]),
+        "collegeId": profiles["collegeId"],
+        "resolution": resolution,
+    })[flagged]
+    return profiles, report[report_columns]
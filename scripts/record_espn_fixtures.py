@@ -0,0 +1,78 @@
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+from espn_client import EspnClient, FetchError, base_url
+from mock_espn_server import fixture_host
+import get_espn_api_player_profiles as scraper
+
+# records a sample of real ESPN documents for mock_espn_server.py --fixtures
+# the documents are the ones the scrapers walk: the v3 list, v2 athletes and the refs they follow from them
+
+script_directory = Path(__file__).resolve().parent
+fixture_directory = script_directory.parent / "data" / "espn" / "fixtures"
+
+
+def refs(doc):
+    # the $ref links the scrapers follow from an athlete, collegeAthlete or statistics log document
+    links = [(doc.get(key) or {}).get("$ref") for key in ("collegeAthlete", "college", "statisticslog", "position", "team")]
+    links.append(((doc.get("draft") or {}).get("team") or {}).get("$ref"))
+    # a pro statistics log links each season's totals, which get_espn_api_player_statistics.py reads
+    links += [
+        (item.get("statistics") or {}).get("$ref") for entry in doc.get("entries", []) for item in entry.get("statistics", [])
+        if item.get("type") == "total" and "/leagues/college-" not in ((item.get("statistics") or {}).get("$ref") or "")
+    ]
+    return [link for link in links if link]
+
+
+def save(directory, url, doc, base):
+    path = directory / (urlparse(url).path.strip("/") + ".json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(doc).replace(base, fixture_host))
+
+
+def record_league(client, league, athletes, directory):
+    v3_list_url, v2_ath_url = scraper.league_urls(league, client.base)
+    # one page of the list is enough, the mock pages whatever it's given
+    first_page = client.get_json(v3_list_url.replace("limit=18000", f"limit={athletes}")) or {}
+    items = first_page.get("items", [])[:athletes]
+    save(directory, v3_list_url, {"items": items}, client.base)
+
+    saved = set()
+
+    def walk(url):
+        try:
+            doc = client.get_ref(url)
+        except FetchError as e:
+            print(f"[{league}] Skipping {e}")
+            return
+        if doc is None or url in saved:
+            return
+        saved.add(url)
+        save(directory, url, doc, client.base)
+        for link in refs(doc):
+            walk(link)
+
+    with ThreadPoolExecutor(max_workers=client.concurrency) as pool:
+        list(pool.map(walk, [v2_ath_url.format(a.get("id")) for a in items]))
+    print(f"[{league}] Recorded {len(items)} athletes and {len(saved)} documents")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record ESPN documents as fixtures for the mock server")
+    parser.add_argument("--leagues", default="nfl", help="comma separated leagues to record")
+    parser.add_argument("--athletes", type=int, default=200, help="athletes to record per league")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", type=Path, default=fixture_directory)
+    parser.add_argument("--base-url", default=base_url)
+    args = parser.parse_args()
+
+    client = EspnClient(concurrency=args.concurrency, base=args.base_url)
+    for league in [l.strip().lower() for l in args.leagues.split(",") if l.strip()]:
+        record_league(client, league, args.athletes, args.output)
+
+
+if __name__ == "__main__":
+    main()
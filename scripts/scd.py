@@ -0,0 +1,152 @@
+import csv
+import hashlib
+import os
+
+import pandas as pd
+
+# attributes whose change opens a new version of a player. age is left out on purpose,
+# it ticks up every year and is just overwritten on the open version instead
+tracked_columns = [
+    "fullName", "firstName", "lastName", "position", "jersey", "active", "weight", "height",
+    "dateOfBirth", "experience_years", "birthCity", "birthState", "birthCountry", "debutYear",
+    "college", "collegeId", "college_source", "draftYear", "draftRound", "draftPick", "draftTeam", "team",
+]
+# college_history is a type 1 column too: collecting it for players scraped before it existed isn't a change
+overwrite_columns = ["age", "college_history"]
+scd_columns = ["row_hash", "valid_from", "valid_to", "is_latest"]
+
+
+def canonical(values):
+    '''
+    String form of a column that doesn't depend on how it was written: TRUE/True/true are the same,
+    and so are 307, 307.0 and "307".
+    '''
+
+    values = values.astype("string").str.strip()
+    lower = values.str.lower()
+    values = values.mask(lower.isin(["true", "false"]), lower)
+    numbers = pd.to_numeric(values, errors="coerce")
+    values = values.mask(numbers.notna(), numbers.map(lambda x: f"{x:.15g}", na_action="ignore"))
+    return values.fillna("")
+
+
+def row_hashes(df, columns=tracked_columns):
+    parts = [canonical(df[c]) if c in df.columns else pd.Series("", index=df.index) for c in columns]
+    joined = parts[0].str.cat(parts[1:], sep="\x1f")
+    return joined.map(lambda v: hashlib.sha1(v.encode()).hexdigest()[:16])
+
+
+def read_snapshot(snapshot_csv):
+    if not snapshot_csv.exists():
+        return pd.DataFrame()
+    return pd.read_csv(snapshot_csv, dtype=str)
+
+
+def migrate_legacy(snapshot):
+    '''
+    Splits an old style table (every pull stacked, is_latest flag) into open versions and closed history.
+    Each closed version is valid until the next pull of the same player.
+    '''
+
+    snapshot = snapshot.sort_values(["uuid", "processed_ts"])
+    snapshot["valid_from"] = snapshot["processed_ts"]
+    snapshot["valid_to"] = snapshot.groupby("uuid")["processed_ts"].shift(-1)
+    is_open = snapshot["valid_to"].isna()
+
+    current = snapshot[is_open].copy()
+    current["row_hash"] = row_hashes(current)
+    current["valid_to"] = None
+    current["is_latest"] = "1"
+
+    history = snapshot[~is_open].copy()
+    history["row_hash"] = row_hashes(history)
+    history["is_latest"] = "0"
+    return current, history
+
+
+def append_history(closed, history_directory, league, columns):
+    '''
+    Appends closed versions to history/<league>/<year>.csv, partitioned by the year they were closed.
+    Old partitions are never rewritten, so closing a version costs the same however much history there is.
+    '''
+
+    if closed.empty:
+        return
+    league_directory = history_directory / league
+    league_directory.mkdir(parents=True, exist_ok=True)
+    for year, part in closed.groupby(closed["valid_to"].str[:4]):
+        path = league_directory / f"{year}.csv"
+        header = columns
+        if path.exists():
+            with open(path, newline="") as f:
+                header = next(csv.reader(f))
+        part.reindex(columns=header).to_csv(path, mode="a", header=not path.exists(), index=False)
+
+
+def merge(staged, snapshot_csv, history_directory, league):
+    '''
+    SCD2 merge of freshly scraped rows into a league's snapshot of open versions.
+    New players are inserted, players whose tracked attributes hash differently get a new version and
+    the old one is closed into history, unchanged players only have overwrite_columns refreshed.
+    Work is proportional to the staged rows plus one pass over the snapshot, never the history.
+    Returns the new snapshot and counts of what happened.
+    '''
+
+    snapshot = read_snapshot(snapshot_csv)
+    closed = []
+    if not snapshot.empty and "row_hash" not in snapshot.columns:
+        snapshot, legacy_history = migrate_legacy(snapshot)
+        closed.append(legacy_history)
+
+    staged = staged.drop_duplicates(subset=["uuid"], keep="last").copy()
+    staged["row_hash"] = row_hashes(staged)
+    staged["valid_from"] = staged["processed_ts"]
+    staged["valid_to"] = None
+    staged["is_latest"] = "1"
+
+    if snapshot.empty:
+        snapshot = pd.DataFrame(columns=staged.columns)
+    columns = list(dict.fromkeys(list(snapshot.columns) + list(staged.columns)))
+    for col in scd_columns:
+        columns.remove(col)
+    columns += scd_columns
+
+    snapshot = snapshot.set_index("uuid", drop=False)
+    staged = staged.set_index("uuid", drop=False)
+    known = staged.index.isin(snapshot.index)
+    old_hash = snapshot["row_hash"].reindex(staged.index)
+
+    inserted = staged[~known]
+    changed = staged[known & (old_hash != staged["row_hash"]).to_numpy()]
+    unchanged = staged[known & (old_hash == staged["row_hash"]).to_numpy()]
+
+    # close the versions being replaced
+    replaced = snapshot.loc[changed.index].copy()
+    replaced["valid_to"] = changed["valid_from"]
+    replaced["is_latest"] = "0"
+    closed.append(replaced)
+
+    # type 1 refresh of the columns we don't version
+    for col in overwrite_columns:
+        if col in unchanged.columns:
+            if col not in snapshot.columns:
+                snapshot[col] = None
+            snapshot.loc[unchanged.index, col] = unchanged[col]
+
+    snapshot = pd.concat(
+        [snapshot.drop(index=changed.index), changed, inserted], ignore_index=True
+    ).reindex(columns=columns)
+
+    append_history(pd.concat(closed, ignore_index=True), history_directory, league, columns)
+
+    tmp_csv = snapshot_csv.with_name(snapshot_csv.name + ".tmp")
+    snapshot.to_csv(tmp_csv, index=False)
+    os.replace(tmp_csv, snapshot_csv)
+
+    stats = {
+        "inserted": len(inserted),
+        "changed": len(changed),
+        "unchanged": len(unchanged),
+        "closed": sum(len(c) for c in closed),
+    }
+    return snapshot, stats
@@ -0,0 +1,62 @@
+import csv
+import os
+
+
+class StagingWriter:
+    '''
+    Append-only staging csv for one league's scrape plus a checkpoint of finished athlete ids.
+    Rows are buffered and flushed in batches, and ids only reach the checkpoint after their rows
+    are on disk, so an interrupted run loses at most the batch it was working on.
+    '''
+
+    def __init__(self, staging_csv, checkpoint, batch_size=500):
+        self.staging_csv = staging_csv
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.written = 0
+        self._buffer = []
+        self._fieldnames = None
+        if staging_csv.exists() and staging_csv.stat().st_size:
+            with open(staging_csv, newline="") as f:
+                self._fieldnames = next(csv.reader(f))
+
+    def add(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        new_file = self._fieldnames is None
+        if new_file:
+            self._fieldnames = list(self._buffer[0].keys())
+        with open(self.staging_csv, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self._fieldnames)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(self._buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.checkpoint, "a") as f:
+            f.writelines(f"{row['id']}\n" for row in self._buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        self.written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+
+def read_checkpoint(checkpoint):
+    if not checkpoint.exists():
+        return set()
+    with open(checkpoint) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def discard(*paths):
+    for path in paths:
+        if path.exists():
+            path.unlink()
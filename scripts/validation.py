@@ -0,0 +1,73 @@
+import pandas as pd
+
+from wdtb.answers import alias_table
+
+# checks the app dataset has to pass before it's written. blocking issues fail the build,
+# warnings only go in the report
+
+issue_columns = ["check", "severity", "uuid", "league", "fullName", "collegeId", "value"]
+
+# no one has played 40 years, anything outside this is a bad pull
+max_experience = 40
+
+
+def player_issues(players, mask, check, severity, value):
+    found = players.loc[mask, ["uuid", "league", "fullName", "collegeId"]].copy()
+    found["check"] = check
+    found["severity"] = severity
+    found["value"] = value[mask] if isinstance(value, pd.Series) else value
+    return found
+
+
+def shared_aliases(accepted_answers):
+    # aliases that normalize to the same text for more than one college, a guess of it can't tell them apart
+    aliases = alias_table(accepted_answers)
+    shared = aliases[aliases["key"].duplicated(keep=False)].sort_values(["key", "collegeId"])
+    return pd.DataFrame({
+        "check": "shared_alias",
+        "severity": "warning",
+        "collegeId": shared["collegeId"],
+        "value": shared["key"],
+    })
+
+
+def validate(players, accepted_answers):
+    '''
+    Every issue in the app dataset as one frame (issue_columns). All checks are column ops or anti-joins:
+    - collegeId missing or not in accepted_answers (blocking, the guess form can't grade the player)
+    - collegeId listed more than once in accepted_answers (blocking, its display name is ambiguous)
+    - duplicate uuid (blocking)
+    - null or placeholder position, null, negative, fractional or absurd experience (blocking)
+    - aliases shared by more than one college (warning)
+    '''
+
+    players = players.reset_index(drop=True)
+    accepted_answers = accepted_answers.reset_index(drop=True)
+    answer_ids = pd.to_numeric(accepted_answers["collegeId"], errors="coerce")
+    college_ids = pd.to_numeric(players["collegeId"], errors="coerce")
+    position = players["position"].astype("string").str.strip()
+    experience = pd.to_numeric(players["experience_years"], errors="coerce")
+
+    issues = [
+        player_issues(players, college_ids.isna(), "missing_collegeId", "blocking", players["college"].astype("string")),
+        player_issues(players, college_ids.notna() & ~college_ids.isin(answer_ids), "unmapped_collegeId", "blocking",
+                      players["college"].astype("string")),
+        player_issues(players, players["uuid"].duplicated(keep=False), "duplicate_uuid", "blocking", players["uuid"]),
+        player_issues(players, (position.isna() | position.isin(["", "-"])).astype(bool), "invalid_position", "blocking", position),
+        player_issues(players, (experience.isna() | (experience < 0) | (experience > max_experience) | (experience % 1 != 0)).astype(bool),
+                      "invalid_experience", "blocking", experience.astype("string")),
+    ]
+
+    duplicated_ids = answer_ids[answer_ids.duplicated(keep=False)]
+    issues.append(pd.DataFrame({
+        "check": "duplicate_answer_collegeId",
+        "severity": "blocking",
+        "collegeId": duplicated_ids,
+        "value": accepted_answers.loc[duplicated_ids.index, "college"],
+    }))
+    issues.append(shared_aliases(accepted_answers))
+
+    issues = [i for i in issues if not i.empty]
+    if not issues:
+        return pd.DataFrame(columns=issue_columns)
+    return pd.concat(issues, ignore_index=True).reindex(columns=issue_columns)
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wdtb.answers import AnswerIndex
+
+
+def answer_index():
+    return AnswerIndex(pd.DataFrame({
+        "college": ["Alabama", "Ohio State", "USC", "Mississippi State", "Mississippi"],
+        "display_name": ["Alabama", "Ohio State", "USC", "Mississippi State", "Ole Miss"],
+        "collegeId": [1, 2, 3, 4, 5],
+        "variant_1": ["bama", "osu", "southern cal", None, "ole miss"],
+    }))
+
+
+def test_exact_aliases_match_after_normalizing():
+    answers = answer_index()
+    assert answers.check("  ALABAMA ", 1)[0]
+    assert answers.check("Ohio St.", 2)[0]
+    assert answers.check("Mississippi Saint", 4)[0]
+    assert not answers.check("Alabama", 2)[0]
+
+
+def test_short_guesses_have_to_be_exact():
+    # up to 4 characters, abbreviations like usc and lsu differ by one letter
+    answers = answer_index()
+    assert answers.check("usc", 3)[0]
+    assert not answers.check("usx", 3)[0]
+    assert not answers.check("bam", 1)[0]
+
+
+def test_one_typo_from_5_to_8_characters():
+    answers = answer_index()
+    assert answers.check("alabma", 1)[0]
+    assert answers.check("alaabma", 1)[0]  # a swapped pair is one typo
+    assert not answers.check("alxbmx", 1)[0]
+
+
+def test_two_typos_from_9_characters():
+    answers = answer_index()
+    assert answers.check("misisippi st", 4)[0]
+    assert not answers.check("misisipi st", 4)[0]
+
+
+def test_typo_closer_to_another_college_is_wrong():
+    # "mississippi s" is within two typos of both, but one away from mississippi st
+    answers = answer_index()
+    assert answers.check("mississippi s", 4)[0]
+    assert not answers.check("mississippi s", 5)[0]
+
+
+def test_transfers_count_and_are_shown():
+    answers = answer_index()
+    assert answers.check("Ohio State", 1, also=[2]) == (True, "Alabama (also Ohio State)")
+
+
+def test_college_missing_from_the_answers_is_graded_wrong_not_an_error():
+    answers = answer_index()
+    assert answers.check("Alabama", 99, name="Old Dominion") == (False, "Old Dominion")
+    assert answers.check("Alabama", 99) == (False, "99")
+    assert answers.check("Alabama", 1, also=[99]) == (True, "Alabama")
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wdtb.pool import PoolCursor, SeenSet
+
+
+def pools():
+    everyone = np.arange(1000, dtype=np.int32)
+    evens = np.arange(0, 1000, 2, dtype=np.int32)
+    return everyone, evens
+
+
+def test_pool_counts_follow_added_rows():
+    everyone, evens = pools()
+    seen = SeenSet(1000, max_pools=1)
+    assert seen.count_in(evens) == 0
+    for row in [2, 3, 4, 4, 999]:
+        seen.add(row)
+        # asking about the other pool evicts this one, so both the cached and the counted path are used
+        assert seen.count_in(evens) == sum(r in seen for r in evens)
+        assert seen.count_in(everyone) == seen.count == len({2, 3, 4, 999} & set(range(row + 1)))
+
+
+def test_reset_starts_counting_from_zero():
+    everyone, evens = pools()
+    seen = SeenSet(1000)
+    for row in range(0, 1000, 3):
+        seen.add(row)
+    assert seen.count_in(evens) == 167
+
+    # the app resets a session by starting a new SeenSet, the old counts mustn't carry over
+    seen = SeenSet(1000)
+    assert seen.count_in(evens) == 0
+    seen.add(10)
+    seen.add(11)
+    assert seen.count_in(evens) == 1
+    assert seen.count_in(everyone) == 2
+
+
+def test_cursor_walks_every_unseen_row_once_then_stops():
+    _, evens = pools()
+    seen = SeenSet(1000)
+    cursor = PoolCursor(evens, seed=1)
+    drawn = []
+    while (row := cursor.next_unseen(seen)) is not None:
+        drawn.append(row)
+        seen.add(row)
+    assert sorted(drawn) == evens.tolist()
+    assert seen.count_in(evens) == len(evens)
+
+    # after a reset the same cursor walks the pool again
+    seen = SeenSet(1000)
+    assert cursor.next_unseen(seen) in set(evens.tolist())
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+from time import monotonic
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from rate_control import AdaptiveRate
+
+
+def settled(rate=100.0):
+    # half a window of 5xx is the first push back of a run: one cut, out of slow start, window cleared.
+    # no cooldown, so the overloads a test drives right after aren't hidden behind this cut
+    limiter = AdaptiveRate(rate=rate / 0.7, burst=32, decrease=0.7, cooldown=0, window=100)
+    for _ in range(50):
+        limiter.error()
+    assert abs(limiter.rate - rate) < 1e-6
+    return limiter
+
+
+def test_one_429_among_healthy_responses_keeps_the_rate():
+    limiter = settled()
+    for _ in range(500):
+        limiter.success()
+    limiter.throttled(retry_after=5)
+    assert limiter.rate >= 0.7 * 100
+    for _ in range(500):
+        limiter.success()
+    assert limiter.rate >= 100
+
+    # only the thread that got the 429 waits out Retry-After
+    start = monotonic()
+    limiter.acquire()
+    assert monotonic() - start < 0.5
+
+
+def test_isolated_5xx_dont_cut_the_rate():
+    limiter = settled()
+    for i in range(2000):
+        if i % 50 == 0:
+            limiter.error()
+        else:
+            limiter.success()
+    assert limiter.rate >= 100
+
+
+def test_sustained_5xx_cut_the_rate():
+    limiter = settled()
+    for _ in range(60):
+        limiter.error()
+    assert limiter.rate <= 0.7 * 100 + 1e-9
+
+
+def test_burst_of_429s_pauses_everyone():
+    limiter = settled()
+    for _ in range(40):
+        limiter.success()
+    for _ in range(10):
+        limiter.throttled(retry_after=0.3)
+    # the burst only cuts the rate once
+    assert 0.7 * 100 <= limiter.rate <= 0.7 * 140
+
+    start = monotonic()
+    limiter.acquire()
+    assert monotonic() - start >= 0.25
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from get_espn_api_player_profiles import plan_refresh, summary_fields
+
+
+def athlete(aid, **fields):
+    return {"id": aid, "fullName": f"Player {aid}", "jersey": "10", "active": True, "age": 25, **fields}
+
+
+def stored(athletes, processed_ts="2026-01-01"):
+    return pd.DataFrame([
+        {"uuid": f"{a['id']}_nfl", "id": a["id"], "league": "nfl", **summary_fields(a), "college": "Alabama",
+         "processed_ts": processed_ts}
+        for a in athletes
+    ]).astype(str)
+
+
+def test_refresh_fetches_only_new_and_changed_athletes():
+    before = [athlete("1"), athlete("2"), athlete("3")]
+    listed = [athlete("1"), athlete("2", jersey="12"), athlete("3", age=26), athlete("4")]
+
+    detail, light_rows, counts = plan_refresh(listed, stored(before), "nfl", "2026-02-01")
+
+    assert counts == {"new": 1, "changed": 1, "aged": 1, "unchanged": 1}
+    assert sorted(a["id"] for a in detail) == ["2", "4"]
+    # the birthday is written from the stored row without any calls
+    assert len(light_rows) == 1
+    row = light_rows[0]
+    assert (row["uuid"], row["age"], row["college"], row["processed_ts"]) == ("3_nfl", 26, "Alabama", "2026-02-01")
+
+
+def test_stored_values_read_back_as_strings_are_unchanged():
+    # the snapshot csv reads True as "True" and 25 as "25", that's not a change
+    athletes = [athlete("1", weight=215.0)]
+    detail, light_rows, counts = plan_refresh(athletes, stored(athletes), "nfl", "2026-02-01")
+    assert counts == {"new": 0, "changed": 0, "aged": 0, "unchanged": 1}
+    assert detail == [] and light_rows == []
@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import scd
+
+
+def staged(rows, processed_ts):
+    return pd.DataFrame([{"processed_ts": processed_ts, **row} for row in rows])
+
+
+def test_changed_row_hash_closes_the_old_version_and_opens_a_new_one(tmp_path):
+    snapshot_csv = tmp_path / "nfl.csv"
+    history = tmp_path / "history"
+    first = [
+        {"uuid": "1_nfl", "fullName": "A", "team": "KC", "age": "25"},
+        {"uuid": "2_nfl", "fullName": "B", "team": "SF", "age": "30"},
+    ]
+    _, stats = scd.merge(staged(first, "2025-01-01"), snapshot_csv, history, "nfl")
+    assert stats == {"inserted": 2, "changed": 0, "unchanged": 0, "closed": 0}
+
+    second = [
+        {"uuid": "1_nfl", "fullName": "A", "team": "BUF", "age": "25"},
+        {"uuid": "2_nfl", "fullName": "B", "team": "SF", "age": "31"},
+        {"uuid": "3_nfl", "fullName": "C", "team": "NE", "age": "22"},
+    ]
+    snapshot, stats = scd.merge(staged(second, "2026-02-01"), snapshot_csv, history, "nfl")
+    assert stats == {"inserted": 1, "changed": 1, "unchanged": 1, "closed": 1}
+
+    # one open version per player, the changed one valid from this pull
+    snapshot = snapshot.set_index("uuid")
+    assert len(snapshot) == 3 and (snapshot["is_latest"] == "1").all()
+    assert snapshot.loc["1_nfl", "team"] == "BUF"
+    assert snapshot.loc["1_nfl", "valid_from"] == "2026-02-01"
+    # age isn't tracked, it's overwritten on the open version
+    assert snapshot.loc["2_nfl", "age"] == "31"
+    assert snapshot.loc["2_nfl", "valid_from"] == "2025-01-01"
+
+    closed = pd.read_csv(history / "nfl" / "2026.csv", dtype=str)
+    assert closed[["uuid", "team", "valid_from", "valid_to", "is_latest"]].values.tolist() == [
+        ["1_nfl", "KC", "2025-01-01", "2026-02-01", "0"]
+    ]
+    assert pd.read_csv(snapshot_csv, dtype=str).set_index("uuid").loc["1_nfl", "team"] == "BUF"
+
+
+def test_unchanged_pull_writes_no_history(tmp_path):
+    snapshot_csv = tmp_path / "nba.csv"
+    history = tmp_path / "history"
+    rows = [{"uuid": "1_nba", "fullName": "A", "active": "True", "collegeId": "307"}]
+    scd.merge(staged(rows, "2025-01-01"), snapshot_csv, history, "nba")
+
+    # same values written differently hash the same
+    rows = [{"uuid": "1_nba", "fullName": "A", "active": "true", "collegeId": "307.0"}]
+    _, stats = scd.merge(staged(rows, "2025-02-01"), snapshot_csv, history, "nba")
+    assert stats == {"inserted": 0, "changed": 0, "unchanged": 1, "closed": 0}
+    assert not (history / "nba").exists()
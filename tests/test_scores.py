@@ -0,0 +1,26 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from wdtb.scores import ScoreStore
+
+
+def test_failed_write_doesnt_stop_later_events(tmp_path):
+    store = ScoreStore(tmp_path / "scores.sqlite", flush_interval=0.01, timeout=0.05, retries=1, retry_delay=0.01)
+
+    # another process holding the write lock past the timeout and every retry
+    other = sqlite3.connect(tmp_path / "scores.sqlite", isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    store.record_guess("u1", "p1", "Alabama", True, 100.0)
+    assert store.flush()
+    other.execute("ROLLBACK")
+    assert store.dropped == 1
+
+    store.record_guess("u1", "p2", "Ohio State", False, 100.0)
+    store.record_challenge("u1", "p2")
+    assert store.flush()
+    assert store.user_score("u1")[:3] == (1, 1, 1)
+    assert store.player_accuracy("p2") == (1, 1)
+    store.close()
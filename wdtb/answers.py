@@ -0,0 +1,194 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+alias_columns = ["college", "display_name", "variant_1", "variant_2", "variant_3", "variant_4", "variant_5", "variant_6"]
+
+# tokens that people write several ways. everything maps to one spelling before matching
+token_map = {
+    "state": "st",
+    "saint": "st",
+    "university": "univ",
+    "&": "and",
+}
+
+
+def normalize(text):
+    '''
+    Canonical form of a college name or guess: lowercase ascii, no punctuation, common abbreviations unified.
+    "St. John's", "Saint Johns" and "st johns" all normalize to "st johns".
+    '''
+
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    text = text.lower().replace("&", " & ")
+    text = re.sub(r"['`]", "", text)
+    text = re.sub(r"[^a-z0-9&]+", " ", text)
+    return " ".join(token_map.get(token, token) for token in text.split())
+
+
+def normalize_series(values):
+    '''
+    normalize for a whole column at once with vectorized string ops, same output as calling normalize per value.
+    Missing values stay missing.
+    '''
+
+    text = values.astype("string").str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    text = text.str.lower().str.replace("&", " & ", regex=False)
+    text = text.str.replace(r"['`]", "", regex=True)
+    text = text.str.replace(r"[^a-z0-9&]+", " ", regex=True).str.strip()
+    tokens = "|".join(re.escape(token) for token in token_map)
+    return text.str.replace(
+        rf"(?<!\S)({tokens})(?!\S)", lambda m: token_map[m.group(1)], regex=True
+    )
+
+
+def alias_table(accepted_answers):
+    '''
+    One row per distinct (normalized alias, collegeId) pair in the accepted answers, as columns key and collegeId.
+    '''
+
+    aliases = accepted_answers.melt(id_vars=["collegeId"], value_vars=[c for c in alias_columns if c in accepted_answers])
+    aliases = aliases.assign(key=normalize_series(aliases["value"])).dropna(subset=["key"])
+    return aliases.loc[aliases["key"] != "", ["key", "collegeId"]].drop_duplicates()
+
+
+def tolerance(text):
+    # how many typos we forgive. short names and abbreviations (usc, lsu) have to be exact
+    if len(text) <= 4:
+        return 0
+    if len(text) <= 8:
+        return 1
+    return 2
+
+
+def grams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a, b, limit):
+    '''
+    Edit distance between a and b counting a swapped pair of letters as one edit,
+    or limit + 1 as soon as it's known to be over limit.
+    '''
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class AnswerIndex:
+    '''
+    Precompiled accepted answers. Every alias is normalized once and indexed by trigram,
+    so checking a guess is a dict lookup plus an edit distance against a handful of candidates.
+    '''
+
+    def __init__(self, accepted_answers):
+        self.display_names = {}
+        self.exact = defaultdict(set)
+        for row in accepted_answers.itertuples(index=False):
+            college_id = int(row.collegeId)
+            self.display_names[college_id] = row.display_name
+            for col in alias_columns:
+                value = getattr(row, col, None)
+                if pd.notna(value) and normalize(value):
+                    self.exact[normalize(value)].add(college_id)
+
+        self.aliases = list(self.exact)
+        self.by_gram = defaultdict(list)
+        for i, alias in enumerate(self.aliases):
+            for gram in grams(alias):
+                self.by_gram[gram].append(i)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path, encoding="utf-8-sig"))
+
+    def closest(self, guess):
+        '''
+        College ids whose aliases are nearest to the guess within its typo tolerance, and that distance.
+        '''
+
+        guess = normalize(guess)
+        if not guess:
+            return set(), None
+        if guess in self.exact:
+            return set(self.exact[guess]), 0
+
+        limit = tolerance(guess)
+        if not limit:
+            return set(), None
+
+        # one edit touches at most 4 trigrams (a swapped pair of letters), so an alias within limit edits
+        # has to share all but 4 * limit of the guess's trigrams
+        guess_grams = grams(guess)
+        shared = defaultdict(int)
+        for gram in guess_grams:
+            for i in self.by_gram.get(gram, ()):
+                shared[i] += 1
+        needed = len(guess_grams) - 4 * limit
+
+        best, matches = limit + 1, set()
+        for i, count in shared.items():
+            if count < needed:
+                continue
+            distance = bounded_distance(guess, self.aliases[i], min(limit, best))
+            if distance < best:
+                best, matches = distance, set(self.exact[self.aliases[i]])
+            elif distance == best:
+                matches |= self.exact[self.aliases[i]]
+        if best > limit:
+            return set(), None
+        return matches, best
+
+    def check(self, guess, college_id, also=(), name=None):
+        '''
+        Whether guess names the college with college_id or any college in also (ie. schools the player
+        transferred from), and the display name to show, with the other colleges in parentheses.
+        A typo counts as long as no other college is a closer match.
+        preprocessing's validation should keep every player's collegeId in the accepted answers, a college that
+        isn't (the answers csv changed after the build) is graded wrong and shown as name, or its id.
+        '''
+
+        matches, _ = self.closest(guess)
+        college_id = int(college_id)
+        others = [int(c) for c in also if int(c) != college_id and int(c) in self.display_names]
+        correct = college_id in matches or any(c in matches for c in others)
+        display = self.display_names.get(college_id, name or str(college_id))
+        if others:
+            display += f" (also {', '.join(self.display_names[c] for c in others)})"
+        return correct, display
+
+
+class CollegeSets:
+    '''
+    Every college each player can be answered with, from the collegeIds column, as two flat arrays
+    aligned with the player store: a player's ids are ids[offsets[row]:offsets[row + 1]].
+    About 8 bytes per player, and a lookup is one slice.
+    '''
+
+    def __init__(self, players):
+        parts = players["collegeIds"].fillna(players["collegeId"].astype("string")).fillna("").str.split(";")
+        counts = parts.str.len().to_numpy()
+        ids = pd.to_numeric(parts.explode(), errors="coerce")
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+        self.ids = ids.fillna(-1).to_numpy(dtype=np.int32)
+        self.offsets.setflags(write=False)
+        self.ids.setflags(write=False)
+
+    def get(self, row):
+        return self.ids[self.offsets[row]:self.offsets[row + 1]]
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from wdtb.difficulty import modes as difficulties
+from wdtb.difficulty import prior_difficulty, tiers
+
+leagues = ["all", "nfl", "nba", "mlb", "nhl"]
+
+# players per daily puzzle
+puzzle_size = 5
+
+
+def day_seed(day):
+    # same date, same puzzle, on every process and every deploy
+    return int.from_bytes(hashlib.sha256(f"wdtb-daily-{day.isoformat()}".encode()).digest()[:8], "big")
+
+
+def build_puzzle(players, player_index, day, size=puzzle_size):
+    '''
+    Date-seeded selection of size players for every league/difficulty, as uuids.
+    Candidates are taken in row id order from the shared index, so the draw only depends on the date and the data.
+    Difficulty is the prior thirds, not the guess-refined scores, so every process builds the same puzzle.
+    '''
+
+    player_tiers = tiers(prior_difficulty(players))
+    uuids = players["uuid"].to_numpy()
+    rng = np.random.default_rng(day_seed(day))
+    puzzle = {}
+    for league in leagues:
+        league_rows = player_index.rows(league)
+        for difficulty in difficulties:
+            candidates = league_rows[player_tiers[league_rows] == difficulty]
+            picked = rng.choice(candidates, size=min(size, len(candidates)), replace=False) if len(candidates) else []
+            puzzle[f"{league}/{difficulty}"] = [str(uuids[row]) for row in picked]
+    return {"date": day.isoformat(), "players": puzzle}
+
+
+class DailyGame:
+    '''
+    One day's puzzle resolved to row ids of the shared player store. Built once per process per day
+    and shared by every session, so serving a session is a dict lookup and an array index.
+    '''
+
+    def __init__(self, artifact, players):
+        self.date = artifact["date"]
+        row_of = dict(zip(players["uuid"].astype(str), range(len(players))))
+        self.puzzles = {}
+        for key, uuids in artifact["players"].items():
+            rows = np.array([row_of[u] for u in uuids if u in row_of], dtype=np.int32)
+            rows.setflags(write=False)
+            self.puzzles[key] = rows
+
+    @classmethod
+    def load(cls, directory, players, player_index, day):
+        '''
+        Reads the day's artifact from directory, building and saving it first if it doesn't exist yet.
+        '''
+
+        path = directory / f"{day.isoformat()}.json"
+        if path.exists():
+            artifact = json.loads(path.read_text())
+        else:
+            artifact = build_puzzle(players, player_index, day)
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(artifact, indent=2))
+                os.replace(tmp_path, path)
+            except OSError:
+                # read-only deploys just rebuild it per process, the result is the same
+                pass
+        return cls(artifact, players)
+
+    def rows(self, league, difficulty):
+        return self.puzzles.get(f"{league}/{difficulty}", np.empty(0, dtype=np.int32))
+
+
+class DailyResults:
+    '''
+    How everyone did on one day's puzzles, shared across sessions in the process.
+    Per puzzle it keeps guesses and correct answers per slot and a histogram of final scores, plus each user's
+    answers so far, so a user replaying a puzzle (a reload, a second tab) never counts twice.
+    Seeded from the score store's daily progress, every update is a few integer increments under one lock.
+    '''
+
+    def __init__(self, size=puzzle_size):
+        self.size = size
+        self._guesses = {}
+        self._correct = {}
+        self._scores = {}
+        self._answers = {}
+        self._lock = threading.Lock()
+
+    def _arrays(self, key):
+        if key not in self._guesses:
+            self._guesses[key] = np.zeros(self.size, dtype=np.int64)
+            self._correct[key] = np.zeros(self.size, dtype=np.int64)
+            self._scores[key] = np.zeros(self.size + 1, dtype=np.int64)
+            self._answers[key] = {}
+        return self._guesses[key], self._correct[key], self._scores[key]
+
+    def seed(self, rows):
+        # rows of (puzzle key, user_id, answers, finished), as ScoreStore.daily_results returns them
+        for key, user_id, answers, finished in rows:
+            self.record(key, user_id, answers, finished)
+
+    def record(self, key, user_id, answers, finished):
+        '''
+        Counts the slots of answers (a 1 or 0 per slot) the user hadn't answered yet, and their score once finished.
+        '''
+
+        with self._lock:
+            guesses, corrects, scores = self._arrays(key)
+            before, was_finished = self._answers[key].get(user_id, ("", False))
+            if len(answers) <= len(before):
+                return
+            for slot in range(len(before), len(answers)):
+                guesses[slot] += 1
+                corrects[slot] += answers[slot] == "1"
+            if finished and not was_finished:
+                scores[answers.count("1")] += 1
+            self._answers[key][user_id] = (answers, bool(finished))
+
+    def answers(self, key, user_id):
+        with self._lock:
+            return self._answers.get(key, {}).get(user_id, ("", False))[0]
+
+    def summary(self, key):
+        '''
+        Finished players, their average score and the share of guesses that were right per slot.
+        '''
+
+        with self._lock:
+            guesses, corrects, scores = (a.copy() for a in self._arrays(key))
+        finished = int(scores.sum())
+        average = float((scores * np.arange(len(scores))).sum() / finished) if finished else None
+        solved = [float(c / g) if g else None for c, g in zip(corrects, guesses)]
+        return {"finished": finished, "average": average, "solved": solved, "scores": scores.tolist()}
@@ -0,0 +1,184 @@
+import random
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+modes = ["Easy", "Medium", "Hard"]
+
+# how recognizable each position tends to be, on top of career length and draft slot
+position_fame = {
+    "QB": 1.0, "RB": 0.8, "WR": 0.8, "TE": 0.7,
+    "PG": 0.8, "SG": 0.8, "SF": 0.8, "PF": 0.8, "C": 0.7, "G": 0.7, "F": 0.7,
+    "SP": 0.6, "RP": 0.4, "P": 0.5, "DH": 0.6, "OF": 0.6, "CF": 0.6, "LF": 0.6, "RF": 0.6, "SS": 0.6,
+    "1B": 0.6, "2B": 0.6, "3B": 0.6, "LW": 0.6, "RW": 0.6, "D": 0.5,
+}
+
+# how many guesses the prior is worth. after this many real guesses a player's observed
+# accuracy counts as much as the prior
+prior_weight = 5
+
+# the sampling weights are rebuilt from the refined scores every this many guesses
+epoch_size = 200
+
+
+def prior_difficulty(players):
+    '''
+    Difficulty from what we know about each player before anyone guesses: long careers, early draft picks,
+    active players and marquee positions are easier. Returned as percentiles in [0, 1], 1 being hardest,
+    aligned with the player rows.
+    '''
+
+    experience = np.clip(players["experience_years"].fillna(0).to_numpy(dtype=float) / 12, 0, 1)
+    draft_round = players["draftRound"].fillna(0).to_numpy(dtype=float)
+    drafted = np.where(draft_round > 0, np.clip(1.2 - draft_round * 0.15, 0, 1), 0)
+    active = players["active"].to_numpy(dtype=float)
+    position = players["position"].astype("string").str.upper().map(position_fame).fillna(0.5).to_numpy(dtype=float)
+
+    fame = 0.45 * experience + 0.35 * drafted + 0.1 * active + 0.1 * position
+    # rank rather than raw score so the easy, medium and hard thirds are the same size
+    ranks = np.argsort(np.argsort(-fame, kind="stable"), kind="stable")
+    return (ranks / max(len(ranks) - 1, 1)).astype(np.float32)
+
+
+def tiers(scores):
+    # Easy/Medium/Hard thirds of a difficulty array
+    return np.where(scores < 1 / 3, "Easy", np.where(scores < 2 / 3, "Medium", "Hard"))
+
+
+def mode_weights(scores, mode):
+    if mode == "Easy":
+        return (1 - scores) ** 3
+    if mode == "Hard":
+        return scores ** 3
+    return np.exp(-((scores - 0.5) / 0.2) ** 2)
+
+
+class WeightedSampler:
+    '''
+    Cumulative weights over a pool's row ids, so a weighted draw is one binary search.
+    '''
+
+    def __init__(self, rows, weights):
+        self.rows = rows
+        self.cumulative = np.cumsum(weights[rows], dtype=np.float64)
+
+    def draw(self, rng):
+        if not len(self.rows) or self.cumulative[-1] <= 0:
+            return None
+        i = np.searchsorted(self.cumulative, rng.random() * self.cumulative[-1], side="right")
+        return int(self.rows[min(i, len(self.rows) - 1)])
+
+
+class DifficultyIndex:
+    '''
+    Per-player difficulty aligned with the player store, shared by every session.
+    Starts from prior_difficulty and is refined with each recorded guess: a player's score is the prior
+    blended with how often people get them wrong. Samplers per pool and mode are built from a snapshot
+    of the scores that's refreshed every epoch_size guesses, so picks stay O(log n).
+    '''
+
+    def __init__(self, players, max_samplers=256):
+        self.prior = prior_difficulty(players)
+        self.guesses = np.zeros(len(players), dtype=np.int32)
+        self.wrong = np.zeros(len(players), dtype=np.int32)
+        self.scores = self.prior.copy()
+        self.epoch = 0
+        self.max_samplers = max_samplers
+        self._row_of = dict(zip(players["uuid"].astype(str), range(len(players))))
+        self._since_epoch = 0
+        self._snapshot = self.scores.copy()
+        self._samplers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seed(self, accuracy):
+        '''
+        Loads past outcomes, ie. ScoreStore.player_accuracy_table(): (player_uuid, guesses, correct) rows.
+        '''
+
+        with self._lock:
+            for player_uuid, guesses, correct in accuracy:
+                row = self._row_of.get(player_uuid)
+                if row is not None:
+                    self.guesses[row] += guesses
+                    self.wrong[row] += max(guesses - correct, 0)
+            self.scores = (prior_weight * self.prior + self.wrong) / (prior_weight + self.guesses)
+            self._new_epoch()
+
+    def observe(self, row, correct):
+        with self._lock:
+            self.guesses[row] += 1
+            self.wrong[row] += 0 if correct else 1
+            self._rescore(row)
+
+    def undo_miss(self, row):
+        # a successful challenge turns the player's last miss into a hit, the same as it does in the score store
+        with self._lock:
+            if self.wrong[row] > 0:
+                self.wrong[row] -= 1
+                self._rescore(row)
+
+    def _rescore(self, row):
+        self.scores[row] = (prior_weight * self.prior[row] + self.wrong[row]) / (prior_weight + self.guesses[row])
+        self._since_epoch += 1
+        if self._since_epoch >= epoch_size:
+            self._new_epoch()
+
+    def _new_epoch(self):
+        self._snapshot = self.scores.astype(np.float32)
+        self._samplers.clear()
+        self._since_epoch = 0
+        self.epoch += 1
+
+    def sampler(self, pool_key, rows, mode):
+        key = (pool_key, mode)
+        with self._lock:
+            sampler = self._samplers.get(key)
+            if sampler is None:
+                sampler = WeightedSampler(rows, mode_weights(self._snapshot, mode))
+                self._samplers[key] = sampler
+                if len(self._samplers) > self.max_samplers:
+                    self._samplers.popitem(last=False)
+            else:
+                self._samplers.move_to_end(key)
+            return sampler
+
+
+class WeightedCursor:
+    '''
+    Drop in for PoolCursor that favours players of one difficulty.
+    Seen players are skipped by redrawing, and if the pool's weighted players are mostly answered
+    it falls back to the uniform walk of the fallback cursor so a pick always terminates.
+    '''
+
+    def __init__(self, index, pool_key, rows, mode, fallback, seed=None, attempts=32):
+        self.index = index
+        self.pool_key = pool_key
+        self.rows = rows
+        self.mode = mode
+        self.fallback = fallback
+        self.attempts = attempts
+        self._rng = random.Random(seed)
+        self._peeked = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def next_unseen(self, seen):
+        peeked, self._peeked = self._peeked, None
+        if peeked is not None and peeked not in seen:
+            return peeked
+
+        sampler = self.index.sampler(self.pool_key, self.rows, self.mode)
+        for _ in range(self.attempts):
+            row = sampler.draw(self._rng)
+            if row is None:
+                break
+            if row not in seen:
+                return row
+        return self.fallback.next_unseen(seen)
+
+    def peek_unseen(self, seen):
+        if self._peeked is None or self._peeked in seen:
+            self._peeked = self.next_unseen(seen)
+        return self._peeked
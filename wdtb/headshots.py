@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pandas as pd
+import requests
+
+# point at a local stand-in instead of the ESPN CDN, ie. ESPN_CDN_BASE=http://127.0.0.1:8765
+cdn_base = os.environ.get("ESPN_CDN_BASE", "https://a.espncdn.com").rstrip("/")
+
+
+def headshot_url(league, player_id):
+    return f"{cdn_base}/combiner/i?img=/i/headshots/{league}/players/full/{player_id}.png&w=350&h=254"
+
+
+def fallback_url(league):
+    return f"{cdn_base}/combiner/i?img=/i/teamlogos/leagues/500/{league}.png&w=350&h=254"
+
+
+def head_ok(url, timeout=2, session=None):
+    try:
+        response = (session or requests).head(url, timeout=timeout)
+        return response.status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def load_manifest(path):
+    '''
+    uuid -> whether ESPN has a headshot for that player, as built by scripts/build_headshot_manifest.py.
+    '''
+
+    if not path.exists():
+        return {}
+    manifest = pd.read_csv(path, dtype={"uuid": str, "has_headshot": bool})
+    return dict(zip(manifest["uuid"], manifest["has_headshot"]))
+
+
+class HeadshotChecker:
+    '''
+    Background HEAD checks for players missing from the manifest, memoized per url for the whole process.
+    Checks run on a small thread pool so the card can ask for the next player's headshot ahead of time.
+    '''
+
+    def __init__(self, workers=8, timeout=2):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="headshot")
+        self._lock = threading.Lock()
+        self._checks = {}
+
+    def check(self, url):
+        with self._lock:
+            future = self._checks.get(url)
+            if future is None:
+                future = self._pool.submit(head_ok, url, self.timeout)
+                self._checks[url] = future
+        return future
+
+    def available(self, url, wait=None):
+        '''
+        Whether the headshot exists, waiting at most wait seconds for a check still in flight.
+        A check that hasn't finished counts as unavailable for now but keeps running, so the next rerun gets the answer.
+        '''
+
+        try:
+            return self.check(url).result(timeout=self.timeout if wait is None else wait)
+        except TimeoutError:
+            return False
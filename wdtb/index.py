@@ -0,0 +1,78 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+def _postings(values):
+    '''
+    Maps each distinct value to the sorted row ids holding it. Missing values are skipped.
+    '''
+
+    postings = {}
+    codes, uniques = values.factorize()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    for i, value in enumerate(uniques):
+        rows = order[bounds[i]:bounds[i + 1]].astype(np.int32)
+        rows.setflags(write=False)
+        postings[value] = rows
+    return postings
+
+
+class PlayerIndex:
+    '''
+    Read-only filter index over the player table, built once per process.
+    Each filter value maps to a sorted array of row ids so a sidebar filter is an intersection of a
+    few arrays instead of a scan of the whole table. Position counts and team lists for the sidebar
+    are precomputed per league ("all" covers every league).
+    '''
+
+    def __init__(self, players):
+        self.size = len(players)
+        self.all_rows = np.arange(self.size, dtype=np.int32)
+        self.all_rows.setflags(write=False)
+
+        self.by_league = _postings(players["league"].astype("string"))
+        self.by_position = _postings(players["position"].astype("string").str.strip().str.upper())
+        self.by_team = _postings(players["team"].astype("string"))
+        self.active_rows = np.flatnonzero(players["active"].to_numpy(dtype=bool)).astype(np.int32)
+        self.active_rows.setflags(write=False)
+
+        self.position_counts = {}
+        self.teams = {}
+        for league, rows in [("all", self.all_rows)] + list(self.by_league.items()):
+            subset = players.iloc[rows]
+            counts = subset["position"].dropna().astype("string").value_counts()
+            self.position_counts[league] = list(counts.items())
+            self.teams[league] = sorted(subset["team"].dropna().astype("string").unique())
+
+        self.rows = lru_cache(maxsize=256)(self._rows)
+
+    def _rows(self, league="all", position="", team="All", active_only=False):
+        '''
+        Sorted row ids matching every filter. Empty/"all" values don't filter.
+        '''
+
+        empty = np.empty(0, dtype=np.int32)
+        lists = []
+        if league != "all":
+            lists.append(self.by_league.get(league, empty))
+        if position:
+            lists.append(self.by_position.get(position.strip().upper(), empty))
+        if team != "All":
+            lists.append(self.by_team.get(team, empty))
+        if active_only:
+            lists.append(self.active_rows)
+        if not lists:
+            return self.all_rows
+
+        # intersect smallest first so every step works on the shortest arrays possible
+        lists.sort(key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        rows = rows.astype(np.int32, copy=False)
+        rows.setflags(write=False)
+        return rows
@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+
+
+class SeenSet:
+    '''
+    Bitset of row ids a session has already answered. One bit per player, so ~2 KB for 16k players.
+    Seen counts for the last few pools asked about are kept up to date as rows are added, so counting
+    what's left of the current pool is O(1) per answer instead of a pass over the pool.
+    '''
+
+    def __init__(self, size, max_pools=4):
+        self.size = size
+        self.bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+        self.max_pools = max_pools
+        # id(rows) -> [rows, seen count], rows being the index's sorted read-only arrays
+        self._pools = {}
+
+    def add(self, row):
+        if row not in self:
+            self.bits[row >> 3] |= np.uint8(1 << (row & 7))
+            self.count += 1
+            for pool in self._pools.values():
+                rows = pool[0]
+                i = np.searchsorted(rows, rows.dtype.type(row))
+                if i < len(rows) and rows[i] == row:
+                    pool[1] += 1
+
+    def __contains__(self, row):
+        return bool(self.bits[row >> 3] & (1 << (row & 7)))
+
+    def count_in(self, rows):
+        '''
+        How many of rows have been seen. rows must be sorted, as the index's row arrays are.
+        The first call for a pool reads just the pool's own bits, later calls are a lookup.
+        '''
+
+        if not self.count:
+            return 0
+        pool = self._pools.get(id(rows))
+        if pool is None or pool[0] is not rows:
+            # in chunks so the temporaries stay small on big pools
+            seen = 0
+            for start in range(0, len(rows), 1 << 16):
+                chunk = rows[start:start + (1 << 16)]
+                seen += int(np.count_nonzero(self.bits[chunk >> 3] & (1 << (chunk & 7)).astype(np.uint8)))
+            if len(self._pools) >= self.max_pools:
+                self._pools.pop(next(iter(self._pools)))
+            pool = self._pools[id(rows)] = [rows, seen]
+        return pool[1]
+
+
+class PoolCursor:
+    '''
+    Walks a filter's row ids in random order, one Fisher-Yates step per draw.
+    rows is the shared read-only array from the index and is never copied, only the positions
+    swapped so far are stored, so a session's footprint grows with how many players it has drawn.
+    '''
+
+    def __init__(self, rows, seed=None):
+        self.rows = rows
+        self.position = 0
+        self._swaps = {}
+        self._rng = random.Random(seed)
+        self._peeked = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _draw(self):
+        i = self.position
+        j = self._rng.randrange(i, len(self.rows))
+        picked = self._swaps.get(j, j)
+        self._swaps[j] = self._swaps.pop(i, i)
+        self.position += 1
+        return int(self.rows[picked])
+
+    def next_unseen(self, seen):
+        '''
+        Next row id in the shuffle that isn't in seen, or None if every row has been seen.
+        Players drawn but never answered (ie. filters changed mid question) come back on the next pass.
+        '''
+
+        peeked, self._peeked = self._peeked, None
+        if peeked is not None and peeked not in seen:
+            return peeked
+
+        for _ in range(2):
+            while self.position < len(self.rows):
+                row = self._draw()
+                if row not in seen:
+                    return row
+            if seen.count_in(self.rows) >= len(self.rows):
+                return None
+            self.position = 0
+            self._swaps = {}
+        return None
+
+    def peek_unseen(self, seen):
+        '''
+        The row next_unseen will return, without consuming it. Used to prefetch the next player's headshot.
+        '''
+
+        if self._peeked is None or self._peeked in seen:
+            self._peeked = self.next_unseen(seen)
+        return self._peeked
@@ -0,0 +1,54 @@
+import json
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+
+class RerunProfiler:
+    '''
+    Rolling wall time per phase of a Streamlit rerun (load, filter, pick, headshot, render, ...).
+    Shared across sessions in the process, keeping the last window samples of each phase.
+    '''
+
+    def __init__(self, window=500):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, phase, seconds):
+        with self._lock:
+            self._samples[phase].append(seconds)
+
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+
+    def summary(self):
+        with self._lock:
+            samples = {phase: np.array(values) * 1000 for phase, values in self._samples.items()}
+        return {
+            phase: {
+                "n": int(len(ms)),
+                "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                "max_ms": round(float(ms.max()), 2),
+            }
+            for phase, ms in samples.items() if len(ms)
+        }
+
+    def table(self):
+        return pd.DataFrame.from_dict(self.summary(), orient="index").rename_axis("phase")
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    def dump(self, path):
+        path.write_text(self.to_json())
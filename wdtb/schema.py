@@ -0,0 +1,41 @@
+import pandas as pd
+
+# columns the app actually displays or filters on, with the dtype each one is stored as
+# league/position/team are low cardinality so categoricals keep them small and make comparisons cheap
+app_dtypes = {
+    "uuid": "string",
+    "id": "Int64",
+    "league": "category",
+    "fullName": "string",
+    "position": "category",
+    "team": "category",
+    "active": "bool",
+    "experience_years": "Int64",
+    "draftYear": "Int64",
+    "draftRound": "Int64",
+    "college": "string",
+    "collegeId": "Int64",
+    # every college the player can be answered with, "id;id", collegeId first. missing in tables built
+    # before college histories, those players only have collegeId
+    "collegeIds": "string",
+    # career stat lines shown as hints, newline separated, precomputed by preprocessing. missing for players
+    # without statistics and in tables built before statistics were pulled
+    "statHints": "string",
+}
+
+app_columns = list(app_dtypes)
+
+
+def to_app_frame(df):
+    '''
+    Trims a player profile table down to the app columns and casts them to their typed representation.
+    '''
+
+    df = df.reindex(columns=app_columns).copy()
+    # csvs written by older pulls have active as TRUE/FALSE strings
+    if df["active"].dtype != bool:
+        df["active"] = df["active"].astype(str).str.upper().eq("TRUE")
+    for col in ["id", "experience_years", "draftYear", "draftRound", "collegeId"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").round()
+    df = df.astype(app_dtypes)
+    return df.reset_index(drop=True)
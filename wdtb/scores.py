@@ -0,0 +1,221 @@
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+from collections import defaultdict
+from time import sleep, time
+
+logger = logging.getLogger(__name__)
+
+schema = [
+    "CREATE TABLE IF NOT EXISTS events ("
+    "id INTEGER PRIMARY KEY, ts REAL, user_id TEXT, player_uuid TEXT, guess TEXT, correct INTEGER, "
+    "latency_ms REAL, challenge INTEGER, mode TEXT)",
+    # running totals per user and per player, updated with every batch so reads never aggregate events
+    "CREATE TABLE IF NOT EXISTS user_scores ("
+    "user_id TEXT PRIMARY KEY, name TEXT, correct INTEGER DEFAULT 0, total INTEGER DEFAULT 0, "
+    "challenges INTEGER DEFAULT 0, updated_at REAL)",
+    "CREATE INDEX IF NOT EXISTS user_scores_rank ON user_scores (correct DESC, total)",
+    "CREATE TABLE IF NOT EXISTS player_accuracy ("
+    "player_uuid TEXT PRIMARY KEY, guesses INTEGER DEFAULT 0, correct INTEGER DEFAULT 0)",
+    # how far each user got on each daily puzzle, answers is one 1 or 0 per slot answered
+    "CREATE TABLE IF NOT EXISTS daily_progress ("
+    "day TEXT, puzzle TEXT, user_id TEXT, answers TEXT, finished INTEGER, updated_at REAL, "
+    "PRIMARY KEY (day, puzzle, user_id))",
+    "CREATE INDEX IF NOT EXISTS daily_progress_user ON daily_progress (user_id, day)",
+]
+
+
+class ScoreStore:
+    '''
+    Persistent guess history, leaderboard and per-player accuracy on SQLite in WAL mode.
+    Writes are queued and a background thread commits them in batches, so recording a guess never
+    waits on disk. Free play guesses count toward the leaderboard, every guess counts toward player accuracy.
+    Daily puzzle progress is upserted per (day, puzzle, user), so replaying a puzzle never counts twice.
+    Reads go through their own connection and only ever touch the precomputed tables.
+    A batch that fails to commit (ie. the database stayed locked past timeout) is retried with backoff and
+    then dropped and counted in dropped, the writer keeps going either way.
+    '''
+
+    def __init__(self, path, batch_size=200, flush_interval=1.0, timeout=30, retries=3, retry_delay=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._read_lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._connect()
+        for statement in schema:
+            db.execute(statement)
+        db.commit()
+        db.close()
+        self._reader = self._connect()
+
+        self._writer = threading.Thread(target=self._write_loop, name="score-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=self.timeout)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def record_guess(self, user_id, player_uuid, guess, correct, latency_ms, mode="free"):
+        self._queue.put(("event", (time(), user_id, player_uuid, guess, int(correct), latency_ms, 0, mode)))
+
+    def record_challenge(self, user_id, player_uuid, mode="free"):
+        # a challenge turns the last guess into a correct one, for the leaderboard and the player's accuracy
+        self._queue.put(("event", (time(), user_id, player_uuid, None, 1, None, 1, mode)))
+
+    def record_daily(self, day, puzzle, user_id, answers, finished):
+        self._queue.put(("daily", (day, puzzle, user_id, answers, int(finished))))
+
+    def set_name(self, user_id, name):
+        self._queue.put(("name", (user_id, name)))
+
+    def flush(self, timeout=5.0):
+        # blocks until everything queued so far is on disk (or dropped after its retries), mostly for tests and shutdown
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(("stop", None))
+            self._writer.join(timeout=10)
+
+    def _write_loop(self):
+        db = self._connect()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] in ("event", "daily"):
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time())))
+                except queue.Empty:
+                    break
+            self._commit(db, [item for kind, item in batch if kind == "event"],
+                         [item for kind, item in batch if kind == "name"],
+                         [item for kind, item in batch if kind == "daily"])
+            for kind, item in batch:
+                if kind == "flush":
+                    item.set()
+                elif kind == "stop":
+                    running = False
+        db.close()
+
+    def _commit(self, db, events, names, dailies):
+        # an exception here would end the writer thread and everything after it would queue up unsaved
+        for attempt in range(self.retries + 1):
+            try:
+                self._write(db, events, names, dailies)
+                return
+            except Exception:
+                logger.exception("Score write failed (attempt %d of %d)", attempt + 1, self.retries + 1)
+                if attempt < self.retries:
+                    sleep(self.retry_delay * 2 ** attempt)
+        self.dropped += len(events) + len(names) + len(dailies)
+        logger.error("Dropped a batch of %d events, %d names and %d daily results", len(events), len(names), len(dailies))
+
+    def _write(self, db, events, names, dailies=()):
+        if not events and not names and not dailies:
+            return
+        users = defaultdict(lambda: [0, 0, 0])
+        players = defaultdict(lambda: [0, 0])
+        for ts, user_id, player_uuid, guess, correct, latency_ms, challenge, mode in events:
+            if mode == "free":
+                users[user_id][0] += correct
+                users[user_id][1] += 1 - challenge
+                users[user_id][2] += challenge
+            players[player_uuid][0] += 1 - challenge
+            players[player_uuid][1] += correct
+
+        now = time()
+        with db:
+            db.executemany(
+                "INSERT INTO events (ts, user_id, player_uuid, guess, correct, latency_ms, challenge, mode) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                events,
+            )
+            db.executemany(
+                "INSERT INTO user_scores (user_id, correct, total, challenges, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET correct = correct + excluded.correct, "
+                "total = total + excluded.total, challenges = challenges + excluded.challenges, "
+                "updated_at = excluded.updated_at",
+                [(user_id, c, t, ch, now) for user_id, (c, t, ch) in users.items()],
+            )
+            db.executemany(
+                "INSERT INTO player_accuracy (player_uuid, guesses, correct) VALUES (?, ?, ?) "
+                "ON CONFLICT(player_uuid) DO UPDATE SET guesses = guesses + excluded.guesses, "
+                "correct = correct + excluded.correct",
+                [(player_uuid, g, c) for player_uuid, (g, c) in players.items()],
+            )
+            db.executemany(
+                "INSERT INTO user_scores (user_id, name, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET name = excluded.name",
+                [(user_id, name, now) for user_id, name in names],
+            )
+            # progress only ever moves forward, a stale session replaying a slot doesn't overwrite it
+            db.executemany(
+                "INSERT INTO daily_progress (day, puzzle, user_id, answers, finished, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(day, puzzle, user_id) DO UPDATE SET answers = excluded.answers, "
+                "finished = excluded.finished, updated_at = excluded.updated_at "
+                "WHERE length(excluded.answers) > length(answers)",
+                [(*daily, now) for daily in dailies],
+            )
+
+    def _read(self, sql, params=()):
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def user_score(self, user_id):
+        '''
+        (correct, total, challenges, name) for a user, zeros if they haven't played yet.
+        '''
+
+        rows = self._read("SELECT correct, total, challenges, name FROM user_scores WHERE user_id = ?", (user_id,))
+        return rows[0] if rows else (0, 0, 0, None)
+
+    def leaderboard(self, limit=10, min_total=10):
+        '''
+        Top users by correct answers, among users with at least min_total guesses.
+        '''
+
+        return self._read(
+            "SELECT user_id, name, correct, total, challenges FROM user_scores "
+            "WHERE total >= ? ORDER BY correct DESC, total LIMIT ?",
+            (min_total, limit),
+        )
+
+    def player_accuracy_table(self):
+        # every player's (player_uuid, guesses, correct), to seed the difficulty index at startup
+        return self._read("SELECT player_uuid, guesses, correct FROM player_accuracy")
+
+    def player_accuracy(self, player_uuid):
+        '''
+        (guesses, correct) across everyone for one player.
+        '''
+
+        rows = self._read("SELECT guesses, correct FROM player_accuracy WHERE player_uuid = ?", (player_uuid,))
+        return rows[0] if rows else (0, 0)
+
+    def daily_progress(self, day, user_id):
+        '''
+        {puzzle: answers} for everything a user has answered of one day's puzzles.
+        '''
+
+        rows = self._read("SELECT puzzle, answers FROM daily_progress WHERE day = ? AND user_id = ?", (day, user_id))
+        return dict(rows)
+
+    def daily_results(self, day):
+        # every user's (puzzle, user_id, answers, finished) for one day, to seed the day's shared results
+        return self._read("SELECT puzzle, user_id, answers, finished FROM daily_progress WHERE day = ?", (day,))